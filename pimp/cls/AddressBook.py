@@ -1,13 +1,18 @@
 from collections import UserDict
-from typing import List, Optional, Generator
-from datetime import datetime
+from typing import (Callable, Collection, Dict, List, NamedTuple, Optional,
+                    Generator, Tuple)
+import calendar
+from datetime import date, timedelta
 from pydantic import (BaseModel,
                       EmailStr,
                       field_validator,
                       ConfigDict,
                       PastDate)
 import re
-from interfaces.AbcBook import Book
+from functools import lru_cache
+from bisect import bisect_left, bisect_right, insort
+from interfaces.AbcBook import Book, BookDiff
+from cls.indexes import BirthdayIndex, NameIndex, PhoneIndex, TrigramIndex
 
 
 class ZipFormatError(Exception):
@@ -46,7 +51,10 @@ class Address(BaseModel):
 
     @field_validator("zip")
     @classmethod
-    def zip_valid(cls, value: str) -> str:
+    def zip_valid(cls, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            # dumped records have null for the missing ZIP
+            return value
         if not value.isdigit() or len(value) != 5:
             raise ZipFormatError(value=value,
                                  message="ZIP should contain 5 digits.")
@@ -70,6 +78,14 @@ class Phone(BaseModel):
         return value
 
 
+def _anniversary(day: date, year: int) -> date:
+    """Return the same day in another year, Feb 29 falls on Feb 28
+    in common years."""
+    if (day.month, day.day) == (2, 29) and not calendar.isleap(year):
+        return date(year, 2, 28)
+    return day.replace(year=year)
+
+
 class Birthday(BaseModel):
     """Birthday with local string property"""
     model_config = ConfigDict(validate_assignment=True)
@@ -80,28 +96,36 @@ class Birthday(BaseModel):
     def local_str(self) -> str:
         return self.date.strftime("%d-%m-%Y")
 
+    def in_year(self, year: int) -> date:
+        """Date of the birthday in the given year."""
+        return _anniversary(self.date, year)
+
     @property
     def days_to_birthday(self) -> int:
-        cur_year = datetime.today().year
-        bday_to_be = datetime(day=self.date.day,
-                              month=self.date.month,
-                              year=cur_year).date()
-        if bday_to_be < datetime.today().date():
-            bday_to_be = datetime(day=self.date.day,
-                                  month=self.date.month,
-                                  year=cur_year+1).date()
-        return (bday_to_be - datetime.today().date()).days
-
-    def __dict__(self):
+        today = date.today()
+        bday_to_be = self.in_year(today.year)
+        if bday_to_be < today:
+            bday_to_be = self.in_year(today.year + 1)
+        return (bday_to_be - today).days
+
+    @property
+    def as_dict(self) -> dict:
         return {"date": self.date.strftime("%d-%m-%Y")}
 
 
 class Record(BaseModel):
     """
     Class for writing in the address book.
+
+    Search string is cached and dropped whenever a field is assigned or
+    phones are changed with add_phone/edit_phone/delete_phone. In-place
+    changes of nested models (e.g. record.address.city = ...) are not
+    tracked, use set_address instead.
     """
     model_config = ConfigDict(coerce_numbers_to_str=True,
                               validate_assignment=True)
+    # not pydantic fields, so neither validated, compared nor pickled
+    __slots__ = ("_search_cache", "_fields_cache", "_listener")
 
     id: int = 0
     name: str
@@ -110,6 +134,32 @@ class Record(BaseModel):
     address: Optional[Address] = None
     phones: Optional[List[Phone]] = None
 
+    def __setattr__(self, name: str, value) -> None:
+        if name not in self.model_fields:
+            super().__setattr__(name, value)
+            return
+        old_value = getattr(self, name, None)
+        super().__setattr__(name, value)
+        try:
+            self._touch()
+        except KeyError:
+            # owning book refused the change (e.g. name is taken)
+            super().__setattr__(name, old_value)
+            self._touch()
+            raise
+
+    def _bind(self, listener: Optional[Callable[["Record"], None]]) -> None:
+        """Sets callable to be notified when the record changes."""
+        object.__setattr__(self, "_listener", listener)
+
+    def _touch(self) -> None:
+        """Drops cached search string and notifies the listener."""
+        object.__setattr__(self, "_search_cache", None)
+        object.__setattr__(self, "_fields_cache", None)
+        listener = getattr(self, "_listener", None)
+        if listener is not None:
+            listener(self)
+
     def add_phone(self, value: Phone) -> bool:
         """
         Adds a phone number to a record.
@@ -117,6 +167,7 @@ class Record(BaseModel):
         """
         if isinstance(value, Phone) and value.number:
             self.phones.append(value)
+            self._touch()
             return True
         else:
             raise ValueError(f"{value} is not a valid Phone instance")
@@ -128,6 +179,7 @@ class Record(BaseModel):
             if phone == old_phone:
                 self.phones.pop(index)
                 self.phones.append(new_phone)
+                self._touch()
                 return True
 
         raise ValueError(f"Phone {old_phone.number} is not found")
@@ -136,6 +188,7 @@ class Record(BaseModel):
         for index, phone in enumerate(self.phones):
             if phone == del_phone:
                 self.phones.pop(index)
+                self._touch()
                 return True
 
         raise ValueError(f"Phone {del_phone.number} is not found")
@@ -191,38 +244,172 @@ class Record(BaseModel):
             return True
         raise ValueError("Record got no address field")
 
+    @property
+    def search_fields(self) -> Dict[str, Tuple[str, ...]]:
+        """Searchable values of the record by search field name."""
+        cached = getattr(self, "_fields_cache", None)
+        if cached is not None:
+            return cached
+        fields = {
+            "NAME": (self.name,),
+            "ADDRESS": (self.address.as_string if self.address else "",),
+            "EMAIL": (self.email or "",),
+            "PHONES": tuple(str(p.number) for p in self.phones or []),
+            "BDAY": (self.birthday.local_str if self.birthday else "",),
+        }
+        object.__setattr__(self, "_fields_cache", fields)
+        return fields
+
     @property
     def search_str(self) -> str:
-        name_str = self.name
-        address_str = self.address.as_string if self.address else ""
-        email_str = self.email
-        phones_str = '|'.join(str(p.number) for p in self.phones)
-        bday_str = self.birthday.local_str if self.birthday else ""
-        return (
-            f"%NAME%{name_str}::"
-            f"%ADDRESS%{address_str}::"
-            f"%EMAIL%{email_str}::"
-            f"%PHONES%{phones_str}::"
-            f"%BDAY%{bday_str}::"
+        cached = getattr(self, "_search_cache", None)
+        if cached is not None:
+            return cached
+        fields = self.search_fields
+        search_str = (
+            f"%NAME%{fields['NAME'][0]}::"
+            f"%ADDRESS%{fields['ADDRESS'][0]}::"
+            f"%EMAIL%{fields['EMAIL'][0]}::"
+            f"%PHONES%{'|'.join(fields['PHONES'])}::"
+            f"%BDAY%{fields['BDAY'][0]}::"
         )
+        object.__setattr__(self, "_search_cache", search_str)
+        return search_str
 
 
 class AddressBook(Book, UserDict[int, Record]):
     """Class representing an address book."""
+    def __init__(self,
+                 name_casefold: bool = False,
+                 name_normalization: Optional[str] = None) -> None:
+        """
+        Args:
+            name_casefold (bool): Match names case-insensitively.
+            name_normalization (str): Unicode normalization form applied
+                to names before matching ("NFC", "NFKC", ...).
+        """
+        self.name_index = NameIndex(name_casefold, name_normalization)
+        self.trigram_index = TrigramIndex()
+        self.birthday_index = BirthdayIndex()
+        self.phone_index = PhoneIndex()
+        self._order: List[int] = []
+        super().__init__()
+
+    def __getstate__(self) -> dict:
+        # copy, so the book can be saved while it is being changed
+        return {"data": dict(self.data),
+                "name_casefold": self.name_index.casefold,
+                "name_normalization": self.name_index.normalization}
+
+    def __setstate__(self, state: dict) -> None:
+        self.data = state["data"]
+        if any(not isinstance(key, int) for key in self.data):
+            # books saved before records got IDs are keyed by name
+            self.data = dict(enumerate(self.data.values(), start=1))
+            for record_id, record in self.data.items():
+                record.id = record_id
+        self.name_index = NameIndex(state.get("name_casefold", False),
+                                    state.get("name_normalization"))
+        self.trigram_index = TrigramIndex()
+        self.birthday_index = BirthdayIndex()
+        self.phone_index = PhoneIndex()
+        self._reindex()
+
+    def _reindex(self) -> None:
+        """Rebuild indexes from data and sync record counters with it."""
+        self.name_index.clear()
+        self.trigram_index.clear()
+        self.birthday_index.clear()
+        self.phone_index.clear()
+        self._order = sorted(self.data)
+        for record_id, record in self.data.items():
+            record._bind(self._record_changed)
+            self._index_record(record_id, record)
+            try:
+                self.name_index.add(record_id, record.name)
+            except KeyError:
+                # duplicates from older books, first one wins as before
+                continue
+        self.record_counter = len(self.data)
+        self.record_id = max(self.record_id, max(self.data, default=0))
+
+    def configure_name_index(self,
+                             casefold: bool = False,
+                             normalization: Optional[str] = None) -> None:
+        """Change the way names are matched and rebuild the name index.
+
+        Raises KeyError if names become ambiguous with new settings.
+        """
+        name_index = NameIndex(casefold, normalization)
+        for record_id, record in self.data.items():
+            name_index.add(record_id, record.name)
+        self.name_index = name_index
+
+    def _index_record(self, record_id: int, record: Record) -> None:
+        """(Re)index a record in all but the name index."""
+        self.trigram_index.add(record_id, record.search_fields)
+        self.birthday_index.add(record_id,
+                                record.birthday.date
+                                if record.birthday else None)
+        self.phone_index.add(record_id,
+                             tuple(str(phone.number)
+                                   for phone in record.phones or ()))
+
+    def _unindex_record(self, record_id: int) -> None:
+        self.name_index.discard(record_id)
+        self.trigram_index.discard(record_id)
+        self.birthday_index.discard(record_id)
+        self.phone_index.discard(record_id)
+
+    def _record_changed(self, record: Record) -> None:
+        """Keep indexes in sync with a record changed in place."""
+        if self.data.get(record.id) is record:
+            self.name_index.add(record.id, record.name)
+            self._index_record(record.id, record)
+            self._notify("edit", record)
+
     def __getitem__(self, name: str) -> Record | None:
         """Return a record from the address book by name."""
-        for record in self.data.values():
-            if record.name == name:
-                return record
+        record_id = self.name_index.get(name)
+        if record_id is not None:
+            return self.data[record_id]
 
-    def iterator(self) -> Generator[Record, None, None]:
-        """Return an iterator over the records in the address book."""
-        for _ in range(self.records_quantity):
-            yield self.get_records(_, 1)[0]
+    def iterator(self,
+                 sort_by: str = "id") -> Generator[Record, None, None]:
+        """Return an iterator over the records in the address book.
+
+        Args:
+            sort_by (str): "id" (order of adding), "name" or "birthday"
+                (next birthday first, records without one go last).
+        """
+        if sort_by == "id":
+            position = 0
+            while position < len(self._order):
+                record_id = self._order[position]
+                yield self.data[record_id]
+                # the book may change between steps, resume after record_id
+                position = bisect_right(self._order, record_id)
+        elif sort_by == "name":
+            for record_id in self.name_index.sorted_ids():
+                if record := self.data.get(record_id):
+                    yield record
+        elif sort_by == "birthday":
+            today = date.today()
+            for record_id in self.birthday_index.iter_from(today.month,
+                                                           today.day):
+                if record := self.data.get(record_id):
+                    yield record
+            for record_id in self._order[:]:
+                if record_id not in self.birthday_index:
+                    yield self.data[record_id]
+        else:
+            raise ValueError(f"Unknown sort order {sort_by}")
 
     def get_records(self, start: int = 0, limit: int = 5) -> List[Record]:
         """Return a list of records from the address book.
 
+        Records are taken in the order of adding, a page costs O(limit).
+
         Args:
             start (int): The start index.
             limit (int): The quantity of records.
@@ -230,7 +417,8 @@ class AddressBook(Book, UserDict[int, Record]):
         Returns:
             List[Record]: A list of records from the address book.
         """
-        return list(self.data.values())[start: start + limit]
+        return [self.data[record_id]
+                for record_id in self._order[start: start + limit]]
 
     def add_record(self, record: Record) -> bool:
         """Додайте новий запис до адресної книги.
@@ -238,13 +426,36 @@ class AddressBook(Book, UserDict[int, Record]):
         Args:
             record (Record): The record to be added.
         """
-        if not self.get(record.name):
-            AddressBook.record_counter += 1
-            AddressBook.record_id += 1
-            record.id = AddressBook.record_id
-            self.data[record.id] = record
-            return True
-        raise KeyError(f"Record {record.name} already exists")
+        if record.name in self.name_index:
+            raise KeyError(f"Record {record.name} already exists")
+        self.record_counter += 1
+        self.record_id += 1
+        record.id = self.record_id
+        self.data[record.id] = record
+        self.name_index.add(record.id, record.name)
+        self._index_record(record.id, record)
+        insort(self._order, record.id)
+        record._bind(self._record_changed)
+        self._notify("add", record)
+        return True
+
+    def restore_record(self, record: Record) -> bool:
+        """Put a record keeping its id, e.g. when loaded from storage.
+
+        Args:
+            record (Record): The record with id already set.
+        """
+        if record.id is None or record.id in self.data:
+            raise KeyError(f"Record {record.id} already exists")
+        self.name_index.add(record.id, record.name)
+        self.record_counter += 1
+        self.record_id = max(self.record_id, record.id)
+        self.data[record.id] = record
+        self._index_record(record.id, record)
+        insort(self._order, record.id)
+        record._bind(self._record_changed)
+        self._notify("add", record)
+        return True
 
     def edit_record(self,
                     old_record: Record,
@@ -255,8 +466,13 @@ class AddressBook(Book, UserDict[int, Record]):
             new_record (Record): The new record.
         """
         if old_record.id in self.data:
+            self.name_index.add(old_record.id, new_record.name)
+            self.data[old_record.id]._bind(None)
             new_record.id = old_record.id
             self.data[new_record.id] = new_record
+            self._index_record(new_record.id, new_record)
+            new_record._bind(self._record_changed)
+            self._notify("edit", new_record)
             return True
         else:
             raise ValueError("no_such_record")
@@ -267,57 +483,181 @@ class AddressBook(Book, UserDict[int, Record]):
             record (Record): The record to delete.
         """
         if record.id in self.data:
-            self.data.pop(record.id)
-            AddressBook.record_counter -= 1
+            self.data.pop(record.id)._bind(None)
+            self._unindex_record(record.id)
+            del self._order[bisect_left(self._order, record.id)]
+            self.record_counter -= 1
+            self._notify("delete", record)
         else:
             raise ValueError("no_such_record")
 
+    def sync_with(self,
+                  other: "AddressBook",
+                  keep: Collection[int] = ()) -> BookDiff:
+        """Makes the book equal to other applying only the differences,
+        records are matched by ID.
+        Args:
+            other (AddressBook): Book with the new state, e.g. re-read.
+            keep (Collection[int]): IDs of records left as they are,
+                e.g. changed in the book and not saved yet.
+        Returns:
+            BookDiff: IDs of added, changed and removed records.
+        """
+        removed = [record_id for record_id in self._order
+                   if record_id not in other.data and record_id not in keep]
+        for record_id in removed:
+            self.delete_record(self.data[record_id])
+        added, changed = [], []
+        for record_id, record in other.data.items():
+            if record_id in keep:
+                continue
+            current = self.data.get(record_id)
+            if current is None:
+                added.append(record_id)
+            elif current.model_dump() != record.model_dump():
+                changed.append(record_id)
+                self.edit_record(current, record.model_copy(deep=True))
+        for record_id in added:
+            self.restore_record(other.data[record_id].model_copy(deep=True))
+        return BookDiff(added, changed, removed)
+
     def upcoming_mates(self, days: int = 7) -> List[Record]:
         """Return a list of contacts with birthdays upcoming from 
         tomorrow to 7 days ahead.
-        Returns: List[Record]: List of records with upcoming birthdays.
+        Returns: List[Record]: List of records with upcoming birthdays
+            in chronological order.
         """
-        res = []
-        for record in self.data.values():
-            if record.birthday:
-                if 1 <= record.birthday.days_to_birthday <= days:
-                    res.append(record)
-        return res
+        if days < 1:
+            return []
+        today = date.today()
+        # range stops short of today`s anniversary, those are today_mates
+        last_day = _anniversary(today, today.year + 1) - timedelta(days=1)
+        end = min(today + timedelta(days=days), last_day)
+        return [self.data[record_id] for record_id
+                in self.birthday_index.between(today + timedelta(days=1),
+                                               end)]
 
     def today_mates(self) -> List[Record]:
-        res = []
-        for record in self.data.values():
-            if record.birthday:
-                if record.birthday.days_to_birthday == 0:
-                    res.append(record)
-        return res
-
-    def find_record(self, search_params: List[str]) -> List[Record]:
+        today = date.today()
+        return [self.data[record_id] for record_id
+                in self.birthday_index.between(today, today)]
+
+    def find_by_phone(self,
+                      number: str = "",
+                      prefix: str = "",
+                      suffix: str = "") -> List[Record]:
+        """Find records by phone number.
+
+        Args:
+            number (str): Whole phone number (reverse lookup).
+            prefix (str): First digits of a phone number.
+            suffix (str): Last digits of a phone number.
+
+        Returns:
+            List[Record]: Records matching all given parts, in order
+                of adding.
+        """
+        found = None
+        for part, lookup in ((number, self.phone_index.find),
+                             (prefix, self.phone_index.with_prefix),
+                             (suffix, self.phone_index.with_suffix)):
+            if part:
+                ids = set(lookup(part))
+                found = ids if found is None else found & ids
+        if not found:
+            return []
+        return [self.data[record_id] for record_id in sorted(found)]
+
+    def find_record(self,
+                    search_params: List[str],
+                    match_all: bool = False) -> List[Record]:
         """
         Finds records in the address book based on a list of search parameters.
 
+        Each parameter is "%FIELD%value" where FIELD is one of NAME, ADDRESS,
+        EMAIL, PHONES, BDAY and value is a case-insensitive substring.
+        Candidates are narrowed with the trigram index first.
+
         Args:
             search_params (List[str]): A list of search parameters.
+            match_all (bool): Record should match all the conditions
+                (AND), by default any of them (OR).
 
         Returns:
             List[Record]: A list of the found records.
         """
-        regexp_block = r"[\w\.\, ]*"
-        search_exprsns = []
-        for param in search_params:
-            param = (param.replace("\\", "")
-                     .replace(".", "")
-                     .replace("-", "")
-                     .replace(",", ""))
-            search_field,  search_cond = param.rsplit("%", maxsplit=1)
-            search_field += "%"
-            search_exprsns.append(rf"{search_field}{regexp_block}"
-                                  + rf"{search_cond}{regexp_block}::")
-
-        results = []
-        for record in self.values():
-            for search_expr in search_exprsns:
-                if re.search(search_expr, record.search_str, re.I):
-                    results.append(record)
+        plan = compile_search(search_params, match_all)
+        if not plan.conditions:
+            return []
+
+        if self.search_backend is not None:
+            found = self.search_backend.find_record_ids(plan)
+            if found is not None:
+                records = (self.data[record_id] for record_id in found
+                           if record_id in self.data)
+                return [record for record in records if plan.matches(record)]
+
+        candidates = None
+        for condition in plan.conditions:
+            field_ids = self.trigram_index.candidates(condition.field,
+                                                      condition.value)
+            if field_ids is None:
+                if not match_all:
+                    candidates = None
                     break
-        return results
+                continue
+            if candidates is None:
+                candidates = field_ids
+            elif match_all:
+                candidates &= field_ids
+            else:
+                candidates |= field_ids
+
+        if candidates is None:
+            records = self.data.values()
+        else:
+            records = (self.data[record_id]
+                       for record_id in sorted(candidates))
+        return [record for record in records if plan.matches(record)]
+
+
+class SearchCondition(NamedTuple):
+    field: str
+    value: str
+    pattern: re.Pattern
+
+
+class SearchPlan(NamedTuple):
+    """Parsed and compiled find_record query."""
+    conditions: Tuple[SearchCondition, ...]
+    match_all: bool
+
+    def matches(self, record: Record) -> bool:
+        fields = record.search_fields
+        check = all if self.match_all else any
+        return check(any(condition.pattern.search(value)
+                         for value in fields.get(condition.field, ()))
+                     for condition in self.conditions)
+
+
+def compile_search(search_params: List[str],
+                   match_all: bool = False) -> SearchPlan:
+    """Return compiled plan for "%FIELD%value" search parameters.
+
+    Plans are cached by normalized query (field names upper-cased, values
+    lower-cased, order and duplicates ignored).
+    """
+    terms = set()
+    for param in search_params:
+        search_field, search_cond = param.rsplit("%", maxsplit=1)
+        terms.add((search_field.strip("%").upper(), search_cond.lower()))
+    return _compile_search(tuple(sorted(terms)), match_all)
+
+
+@lru_cache(maxsize=256)
+def _compile_search(terms: Tuple[Tuple[str, str], ...],
+                    match_all: bool) -> SearchPlan:
+    conditions = tuple(SearchCondition(field, value,
+                                       re.compile(re.escape(value), re.I))
+                       for field, value in terms)
+    return SearchPlan(conditions, match_all)
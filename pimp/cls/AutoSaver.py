@@ -0,0 +1,92 @@
+"""Background saving of changed books"""
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from interfaces.AbcBook import Book
+from interfaces.DataProviderABC import DataProvider
+
+
+class SaveStats(NamedTuple):
+    """Result of the last save of a book."""
+    saved_at: float
+    latency: float
+    # bytes the provider wrote since the previous save of the book,
+    # write-through providers write changes as they are made
+    bytes_written: int
+    error: str | None = None
+
+
+class AutoSaver(threading.Thread):
+    """Saves books changed since their last save every interval seconds.
+
+    Books count their changes, so a book is saved only when its
+    change counter moved. Saving goes through the book's data provider
+    in this thread, the UI keeps working meanwhile.
+    on_saved(book, provider) is called after every successful save.
+    """
+
+    def __init__(self,
+                 books: List[Tuple[Book, DataProvider]],
+                 interval: float = 30.0,
+                 on_saved: Optional[Callable[[Book, DataProvider],
+                                             None]] = None) -> None:
+        super().__init__(name="autosave", daemon=True)
+        self.books = books
+        self.interval = interval
+        self.on_saved = on_saved
+        self.stats: Dict[str, SaveStats] = {}
+        self._saved_changes = {id(book): book.changes
+                               for book, _ in books if book is not None}
+        self._bytes_written = {id(book): provider.bytes_written
+                               for book, provider in books
+                               if book is not None}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.flush()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def is_dirty(self, book: Book) -> bool:
+        return book.changes != self._saved_changes.get(id(book))
+
+    def saved_changes(self, book: Book) -> int | None:
+        """Change counter of the book at its last save."""
+        return self._saved_changes.get(id(book))
+
+    def mark_saved(self, book: Book) -> None:
+        """Book is known to be equal to its saved data."""
+        with self._lock:
+            self._saved_changes[id(book)] = book.changes
+
+    def flush(self) -> None:
+        """Saves dirty books now."""
+        with self._lock:
+            for book, provider in self.books:
+                if book is not None and self.is_dirty(book):
+                    self._save(book, provider)
+
+    def _save(self, book: Book, provider: DataProvider) -> None:
+        # changes made while saving keep the book dirty
+        changes = book.changes
+        started = time.perf_counter()
+        try:
+            # providers raise DataProviderError when the book isn't saved
+            provider.update_data(book)
+            error = None
+        except Exception as err:
+            error = str(err)
+        latency = time.perf_counter() - started
+        written = provider.bytes_written
+        bytes_written = written - self._bytes_written.get(id(book), 0)
+        self._bytes_written[id(book)] = written
+        if error is None:
+            self._saved_changes[id(book)] = changes
+            if self.on_saved is not None:
+                self.on_saved(book, provider)
+        self.stats[type(book).__name__] = SaveStats(
+            time.time(), latency, bytes_written, error)
@@ -0,0 +1,59 @@
+"""Stand-in for a book loaded in background"""
+import threading
+from typing import Any
+
+from interfaces.AbcBook import Book
+
+
+class LazyBook:
+    """Proxy of a book which is being loaded in background.
+
+    Check `loaded` to show a loading state and `failed` to show a book
+    failed to load, any other attribute waits for the book and is taken
+    from it.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._book: Book | None = None
+        self._error: Exception | None = None
+        self._ready = threading.Event()
+
+    @property
+    def loaded(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def failed(self) -> bool:
+        return self._error is not None
+
+    @property
+    def error(self) -> Exception | None:
+        return self._error
+
+    def set_book(self, book: Book) -> None:
+        self._book = book
+        self._ready.set()
+
+    def set_error(self, error: Exception) -> None:
+        self._error = error
+        self._ready.set()
+
+    def wait(self, timeout: float | None = None) -> Book:
+        """Returns the book as soon as it is loaded."""
+        if not self._ready.wait(timeout):
+            raise TimeoutError(f"{self._name} is still loading")
+        if self._error is not None:
+            raise self._error
+        return self._book
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.wait(), name)
+
+    def __len__(self) -> int:
+        return len(self.wait())
+
+    def __repr__(self) -> str:
+        state = ("failed" if self.failed
+                 else "loaded" if self.loaded else "loading")
+        return f"<LazyBook {self._name} {state}>"
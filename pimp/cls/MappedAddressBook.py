@@ -0,0 +1,159 @@
+"""Read-only address book over a memory-mapped contact store"""
+from bisect import bisect_right
+import calendar
+from collections.abc import Mapping
+from datetime import date, timedelta
+from itertools import chain
+from typing import Collection, Dict, Generator, Iterator, List
+
+from interfaces.AbcBook import Book, BookDiff
+from cls.AddressBook import Record, compile_search, _anniversary
+
+
+class MappedRecords(Mapping):
+    """record id -> Record, records are decoded on the first access."""
+
+    def __init__(self, store) -> None:
+        self.store = store
+        self._decoded: Dict[int, Record] = {}
+
+    def __getitem__(self, record_id: int) -> Record:
+        record = self._decoded.get(record_id)
+        if record is None:
+            pos = self.store.position(record_id)
+            if pos is None:
+                raise KeyError(record_id)
+            record = self._decoded[record_id] = self.store.record(pos)
+        return record
+
+    def at(self, pos: int) -> Record:
+        """Record by its position in ids order."""
+        return self[self.store.ids[pos]]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.store.ids)
+
+    def __len__(self) -> int:
+        return self.store.count
+
+    def __contains__(self, record_id) -> bool:
+        return (record_id in self._decoded
+                or self.store.position(record_id) is not None)
+
+
+class MappedAddressBook(Book):
+    """Address book for viewing and lookups only.
+
+    Records stay in the mapped file until they are looked at, so opening
+    is instant for any size of the book. Changing methods raise
+    ValueError("read_only_book").
+    """
+
+    def __init__(self, store) -> None:
+        self.data = MappedRecords(store)
+
+    @property
+    def records_quantity(self) -> int:
+        return len(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, name: str) -> Record | None:
+        pos = self.data.store.find_name(name)
+        return None if pos is None else self.data.at(pos)
+
+    def add_record(self, record):
+        raise ValueError("read_only_book")
+
+    def edit_record(self, old_record, new_record):
+        raise ValueError("read_only_book")
+
+    def delete_record(self, record):
+        raise ValueError("read_only_book")
+
+    def get_records(self, start: int = 0, limit: int = 5) -> List[Record]:
+        stop = min(start + limit, len(self.data))
+        return [self.data.at(pos) for pos in range(start, stop)]
+
+    def iterator(self,
+                 sort_by: str = "id") -> Generator[Record, None, None]:
+        """Iterates over the records, see AddressBook.iterator.
+        sync_with may switch the store between steps, so records are
+        looked up by id in the current one."""
+        store = self.data.store
+        if sort_by == "id":
+            pos = 0
+            while pos < len(self.data):
+                record = self.data.at(pos)
+                yield record
+                # resume after the record, in whatever store is current
+                pos = bisect_right(self.data.store.ids, record.id)
+            return
+        if sort_by == "name":
+            positions = store.by_name()
+        elif sort_by == "birthday":
+            today = date.today()
+            positions = chain(store.birthdays_from(today.month, today.day),
+                              store.without_birthday())
+        else:
+            raise ValueError(f"Unknown sort order {sort_by}")
+        # ids are taken before the first step, the store may be closed
+        for record_id in [store.ids[pos] for pos in positions]:
+            if record := self.data.get(record_id):
+                yield record
+
+    def _between(self, start: date, end: date) -> List[Record]:
+        """Records with birthdays from start to end inclusive."""
+        if end < start:
+            return []
+        store = self.data.store
+        spans = ([(start.year, (start.month, start.day), (end.month, end.day))]
+                 if start.year == end.year else
+                 [(start.year, (start.month, start.day), (12, 31)),
+                  (end.year, (1, 1), (end.month, end.day))])
+        positions = []
+        for year, first, last in spans:
+            if not calendar.isleap(year) and last == (2, 28):
+                last = (2, 29)
+            positions += store.birthdays(first, last)
+        return [self.data.at(pos) for pos in positions]
+
+    def upcoming_mates(self, days: int = 7) -> List[Record]:
+        """See AddressBook.upcoming_mates."""
+        if days < 1:
+            return []
+        today = date.today()
+        last_day = _anniversary(today, today.year + 1) - timedelta(days=1)
+        end = min(today + timedelta(days=days), last_day)
+        return self._between(today + timedelta(days=1), end)
+
+    def today_mates(self) -> List[Record]:
+        today = date.today()
+        return self._between(today, today)
+
+    def find_record(self,
+                    search_params: List[str],
+                    match_all: bool = False) -> List[Record]:
+        """See AddressBook.find_record, the mapped book has no search
+        index, so every record is looked at."""
+        plan = compile_search(search_params, match_all)
+        if not plan.conditions:
+            return []
+        return [record for record in self.iterator()
+                if plan.matches(record)]
+
+    def sync_with(self,
+                  other: "MappedAddressBook",
+                  keep: Collection[int] = ()) -> BookDiff:
+        """Switches the book to the store of other (the re-read file).
+        Read-only books have no own changes, so keep is ignored."""
+        old, new = self.data.store, other.data.store
+        old_ids, new_ids = set(old.ids), set(new.ids)
+        changed = [record_id for record_id in sorted(old_ids & new_ids)
+                   if old.raw(old.position(record_id))
+                   != new.raw(new.position(record_id))]
+        self.data = other.data
+        old.close()
+        return BookDiff(sorted(new_ids - old_ids), changed,
+                        sorted(old_ids - new_ids))
@@ -1,8 +1,13 @@
 from collections import UserDict
-from typing import List, Dict, Set
+from typing import Collection, List, Dict, Set, Tuple
 import re
+import threading
+import time
+from bisect import bisect_left, insort
 from datetime import datetime
-from interfaces.AbcBook import Book
+from math import ceil
+from interfaces.AbcBook import Book, BookDiff
+from cls.indexes import WordIndex
 
 
 class Note:
@@ -13,7 +18,8 @@ class Note:
     def __init__(self,
                  content: str = "",
                  tags: Set[str] | None = None):
-        self.note_id: int = int(datetime.timestamp(datetime.now()))
+        # assigned by Notebook.add_record
+        self.note_id: int | None = None
         self.tags = self._extract_tags(content)
         self.tags |= set(tags) if tags else set()
         self.content: str = content.replace("#", "")
@@ -42,10 +48,31 @@ class Note:
             return set()
         res = set()
         for tag in re.findall(r'#[\w\-]*\b', content):
-            res |= tag.replace("#", "")
+            res.add(tag.replace("#", ""))
 
         return res
 
+    @property
+    def created(self) -> datetime | None:
+        """Time the note was added to a notebook (taken from its ID)."""
+        if self.note_id is None:
+            return None
+        return datetime.fromtimestamp(NoteIdAllocator.timestamp(self.note_id))
+
+    @property
+    def as_dict(self) -> dict:
+        return {"note_id": self.note_id,
+                "content": self.content,
+                "tags": sorted(self.tags)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Note":
+        """Restores a note saved with as_dict, content is taken as is."""
+        note = cls(tags=data.get("tags"))
+        note.content = data["content"]
+        note.note_id = data.get("note_id")
+        return note
+
     def edit_note(self, note_id: int,
                   new_content: str) -> bool:
         """The edit_note method re-creates the note content.
@@ -56,20 +83,85 @@ class Note:
         return True
 
 
+class NoteIdAllocator:
+    """Allocates unique, monotonic and time-ordered note IDs.
+
+    ID is milliseconds since epoch shifted left by SEQUENCE_BITS plus
+    a sequence number, so up to 4096 IDs per millisecond keep the time
+    order. More IDs in a millisecond (or the clock going back) borrow
+    from the next millisecond, IDs never repeat or decrease.
+    IDs of older notes are plain timestamps in seconds.
+    """
+    SEQUENCE_BITS = 12
+    LEGACY_ID_LIMIT = 1 << 40
+
+    def __init__(self, last_id: int = 0) -> None:
+        self._last_id = last_id
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        """Return new ID bigger than all the previous ones."""
+        with self._lock:
+            clock_id = time.time_ns() // 1_000_000 << self.SEQUENCE_BITS
+            self._last_id = max(clock_id, self._last_id + 1)
+            return self._last_id
+
+    def advance(self, note_id: int) -> None:
+        """Makes sure next IDs are bigger than the given one."""
+        with self._lock:
+            self._last_id = max(self._last_id, note_id)
+
+    @classmethod
+    def timestamp(cls, note_id: int) -> float:
+        """Return POSIX timestamp of the moment ID was allocated."""
+        if note_id < cls.LEGACY_ID_LIMIT:
+            return float(note_id)
+        return (note_id >> cls.SEQUENCE_BITS) / 1000
+
+    @classmethod
+    def first_id(cls, moment: datetime) -> int:
+        """Return the smallest ID that could be allocated at the moment."""
+        return int(moment.timestamp() * 1000) << cls.SEQUENCE_BITS
+
+
 class Notebook(Book, UserDict[int, Note]):
     """The Class Notebook is a notebook
     and contains a list of notes and dict of tags for quicker searching."""
 
     def __init__(self) -> None:
-        self.tag_pool: Dict[str, List[int]] = {}
+        self.tag_pool: Dict[str, Set[int]] = {}
+        self.note_tags: Dict[int, Set[str]] = {}
+        self.word_index = WordIndex()
+        self.id_allocator = NoteIdAllocator()
+        self._order: List[int] = []
         super().__init__()
 
+    def __getstate__(self) -> dict:
+        return {"data": dict(self.data)}
+
+    def __setstate__(self, state: dict) -> None:
+        self.data = state["data"]
+        self._reindex()
+
+    def _reindex(self) -> None:
+        """Rebuild indexes from data and sync the note counter with it."""
+        self.tag_pool = {}
+        self.note_tags = {}
+        self.word_index = WordIndex()
+        self._order = sorted(self.data)
+        self.id_allocator = NoteIdAllocator(max(self._order, default=0))
+        self.record_counter = len(self.data)
+        for note_id, note in self.data.items():
+            # older notes keep tags in lists
+            note.tags = set(note.tags)
+            self._update_tag_pool(note)
+            self.word_index.add(note_id, note.content)
+
     def __getitem__(self, item) -> Note | None:
         """
         item - note_id
         """
-        for _ in range(self.records_quantity):
-            yield self.get_records(_, 1)[0]
+        return self.data.get(item)
 
     def get_records(self, start: int = 0, limit: int = 5):
         """The get_records method returns a list of notes with the specified range.
@@ -78,21 +170,51 @@ class Notebook(Book, UserDict[int, Note]):
             limit (int) : The end of the range.
         Returns:
             List[Note]:Returning value"""
-        return list(self.data.values())[start:start+limit]
+        return [self.data[note_id]
+                for note_id in self._order[start:start+limit]]
+
+    def find_notes_by_period(self,
+                             start: datetime,
+                             end: datetime) -> List[Note]:
+        """The find_notes_by_period method returns notes created from start
+        up to (not including) end, oldest first.
+        Parameters:
+            start (datetime) : The start of the period.
+            end (datetime) : The end of the period.
+        Returns:
+            List[Note]:Returning value"""
+        order = self._order
+        # older notes have IDs in seconds, they all go before the new ones
+        legacy = bisect_left(order, NoteIdAllocator.LEGACY_ID_LIMIT)
+        ids = (order[bisect_left(order, ceil(start.timestamp()), 0, legacy):
+                     bisect_left(order, ceil(end.timestamp()), 0, legacy)]
+               + order[bisect_left(order, NoteIdAllocator.first_id(start),
+                                   legacy):
+                       bisect_left(order, NoteIdAllocator.first_id(end),
+                                   legacy)])
+        return [self.data[note_id] for note_id in ids]
 
     def add_record(self, note: Note) -> bool:
         """The add_note method creates a new note,
         then adds the note to the list and updates the tag_pool.
+        Note gets new ID unless it already has one.
         Parameters:
         argument_1(note_content: str) : It's the string typed by the user.
         """
-        if _ := self.data.get(note.note_id):
+        if note.note_id is None:
+            note.note_id = self.id_allocator.next_id()
+        elif _ := self.data.get(note.note_id):
             raise KeyError("note_exists")
+        else:
+            self.id_allocator.advance(note.note_id)
         self.data[note.note_id] = note
-        Notebook.record_counter += 1
+        insort(self._order, note.note_id)
+        self.record_counter += 1
         self._update_tag_pool(note)
+        self.word_index.add(note.note_id, note.content)
+        self._notify("add", note)
         return True
-        
+
     def delete_record(self, del_note: Note) -> None:
         """The del_note method removes a note from the list and clears the tag_pool of unnecessary IDs.
         Parameters:
@@ -100,13 +222,57 @@ class Notebook(Book, UserDict[int, Note]):
         """
         if _ := self.data.get(del_note.note_id):
             self._clean_tags(del_note.note_id)
+            self.word_index.discard(del_note.note_id)
             self.data.pop(del_note.note_id)
-            Notebook.record_counter -= 1
+            del self._order[bisect_left(self._order, del_note.note_id)]
+            self.record_counter -= 1
+            self._notify("delete", del_note)
 
     def edit_record(self,
                     old_note: Note,
                     new_note: Note) -> bool:
-        pass
+        """The edit_record method replaces a note keeping its ID
+        and updates the tag_pool and the word index.
+        Parameters:
+        argument_1(old_note: Note) : Note to be replaced.
+        argument_2(new_note: Note) : Note with new content and tags.
+        """
+        if old_note.note_id not in self.data:
+            raise ValueError("no_such_note")
+        self._clean_tags(old_note.note_id)
+        new_note.note_id = old_note.note_id
+        self.data[new_note.note_id] = new_note
+        self._update_tag_pool(new_note)
+        self.word_index.add(new_note.note_id, new_note.content)
+        self._notify("edit", new_note)
+        return True
+
+    def sync_with(self,
+                  other: "Notebook",
+                  keep: Collection[int] = ()) -> BookDiff:
+        """The sync_with method makes the notebook equal to other
+        applying only the differences, notes are matched by ID.
+        Parameters:
+        argument_1(other: Notebook) : Notebook with the new state.
+        argument_2(keep: Collection[int]) : IDs of notes left as they are.
+        Returns:
+        BookDiff: IDs of added, changed and removed notes."""
+        removed = [note_id for note_id in self._order
+                   if note_id not in other.data and note_id not in keep]
+        for note_id in removed:
+            self.delete_record(self.data[note_id])
+        added, changed = [], []
+        for note_id, note in other.data.items():
+            if note_id in keep:
+                continue
+            current = self.data.get(note_id)
+            if current is None:
+                added.append(note_id)
+                self.add_record(Note.from_dict(note.as_dict))
+            elif current.as_dict != note.as_dict:
+                changed.append(note_id)
+                self.edit_record(current, Note.from_dict(note.as_dict))
+        return BookDiff(added, changed, removed)
 
     def find_record(self, search_conditions):
         pass
@@ -114,65 +280,136 @@ class Notebook(Book, UserDict[int, Note]):
     def iterator(self):
         pass
 
-    def find_notes_by_keyword(self, keywords: List[str]) -> List[Note]:
+    def find_notes_by_keyword(self,
+                              keywords: List[str],
+                              mode: str = "word") -> List[Note]:
         """The find_notes_by_keyword method returns a list of notes with the specified keyword in the text.
         Parameters:
         argument_1(keyword: str) : User's request for search.
+        argument_2(mode: str) : "word" - notes with any of whole words,
+            "prefix" - notes with words starting with any of keywords,
+            "phrase" - notes with all keywords in a row.
         Returns:
         List[Note]:Returning value
         """
-        res = []
         if len(keywords) == 0 or keywords == [""]:
             return []
-        ids_set = set()
-        for word in keywords:
-            for note in self.data.values():
-                if word.lower() in note.content.lower():
-                    ids_set |= {note.note_id}
-        for note_id in ids_set:
-            res.append(self.data.get(note_id))
-        return res
-       
+        match mode:
+            case "word":
+                lookup = self.word_index.with_word
+            case "prefix":
+                lookup = self.word_index.with_prefix
+            case "phrase":
+                lookup = None
+            case _:
+                raise ValueError(f"Unknown search mode {mode}")
+        if self.search_backend is not None:
+            found = self.search_backend.find_note_ids(keywords, mode)
+            if found is not None:
+                return [self.data[note_id] for note_id in found
+                        if note_id in self.data]
+        if lookup is None:
+            ids_set = self.word_index.with_phrase(" ".join(keywords))
+        else:
+            ids_set = set()
+            for word in keywords:
+                if word:
+                    ids_set |= lookup(word)
+        return [self.data[note_id] for note_id in sorted(ids_set)]
+
     def find_notes_by_tags(self, tag: List[str]) -> List[Note]:
         """The find_notes_by_tags method returns a list of notes that have the given tag.
+        Tags can be combined with AND, OR and NOT (NOT binds first, then AND),
+        tags without an operator between them are joined with OR, e.g.
+        ["python", "AND", "NOT", "textual", "astronomy"].
         Parameters:
         argument_1(tag: str) : User's request for search.
         Returns:
         List[Note]:Returning value"""
         if len(tag) == 0 or tag == [""]:
             return []
-        res: List[Note] = []
         ids_set = set()
-        for entry in tag:
-            if id_list := self.tag_pool.get(entry):
-                ids_set |= set(id_list)
-        for note_id in ids_set:
-            res.append(self.data.get(note_id))
-        return res
-   
+        for group in self._parse_tag_query(tag):
+            ids_set |= self._match_tag_group(group)
+        return [self.data[note_id] for note_id in sorted(ids_set)]
+
+    @staticmethod
+    def _parse_tag_query(tokens: List[str]) -> List[List[Tuple[bool, str]]]:
+        """Splits tag query into OR-ed groups of AND-ed (negated, tag)."""
+        groups = [[]]
+        negate = joined = False
+        for token in tokens:
+            match token:
+                case "":
+                    continue
+                case "OR":
+                    groups.append([])
+                    joined = False
+                case "AND":
+                    joined = True
+                case "NOT":
+                    negate = not negate
+                case _:
+                    if groups[-1] and not joined:
+                        groups.append([])
+                    groups[-1].append((negate, token))
+                    negate = joined = False
+        return [group for group in groups if group]
+
+    def _match_tag_group(self, group: List[Tuple[bool, str]]) -> Set[int]:
+        """Intersects postings of a group, the smallest one first."""
+        included = [self.tag_pool.get(tag, set())
+                    for negated, tag in group if not negated]
+        excluded = [self.tag_pool.get(tag, set())
+                    for negated, tag in group if negated]
+        if included:
+            included.sort(key=len)
+            ids_set = set(included[0])
+            for postings in included[1:]:
+                if not ids_set:
+                    break
+                ids_set &= postings
+        else:
+            ids_set = set(self.data)
+        for postings in excluded:
+            ids_set -= postings
+        return ids_set
+
+    def retag(self, note: Note, tags: Set[str]) -> bool:
+        """The retag method replaces tags of a note kept in the notebook.
+        Parameters:
+        argument_1(note: Note) : Note to retag.
+        argument_2(tags: Set[str]) : New tags of the note.
+        """
+        if self.data.get(note.note_id) is not note:
+            raise ValueError("no_such_note")
+        self._clean_tags(note.note_id)
+        note.tags = set(tags)
+        self._update_tag_pool(note)
+        self._notify("edit", note)
+        return True
+
     def _update_tag_pool(self, note: Note) -> bool:
         """The _update_tag_pool method adds a new tag if it isn't in the dict
-        and adds IDs to the list of the matching tag.
+        and adds IDs to the set of the matching tag.
         Parameters:
         argument_1(note: Note) : Object of Class Note, note forwarded for tag_pool updating."""
 
         for tag in note.tags:
-            if tag not in self.tag_pool:
-                self.tag_pool[tag] = []
-            self.tag_pool[tag].append(note.note_id)
+            self.tag_pool.setdefault(tag, set()).add(note.note_id)
+        self.note_tags[note.note_id] = set(note.tags)
 
         return True
-    
+
     def _clean_tags(self, note_id: int) -> int:
-        """The clean_tags method removes the IDs of a note
-        from the list of the matching tag when the note is deleted.
+        """The clean_tags method removes the ID of a note
+        from the sets of its tags when the note is deleted.
         Parameters:
         argument_1(note_id: int) : value forwarded for deletion note's ID.
         """
         num_removed = 0
-        tags_to_remove = [tag for tag in self.tag_pool if note_id in self.tag_pool[tag]]
-        for tag in tags_to_remove:
-            self.tag_pool[tag].remove(note_id)
+        for tag in self.note_tags.pop(note_id, ()):
+            self.tag_pool[tag].discard(note_id)
             num_removed += 1
             if not self.tag_pool[tag]:
                 del self.tag_pool[tag]
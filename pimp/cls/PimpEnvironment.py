@@ -1,12 +1,27 @@
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 from pathlib import Path
+import threading
+import time
 from cls.AddressBook import AddressBook
-from cls.NoteBook import Notebook
+from cls.NoteBook import Note, Notebook
+from cls.AutoSaver import AutoSaver
+from cls.LazyBook import LazyBook
+from interfaces.AbcBook import Book, BookDiff
 from interfaces.DataProviderABC import DataProvider
-from data_providers import PickleDataProvider, JsonDataProvider
+from data_providers import PickleDataProvider, JsonDataProvider, \
+    SqliteDataProvider, JournalDataProvider, JsonlDataProvider, \
+    BinaryDataProvider, MmapDataProvider
 import yaml
 
 
+def _as_dict(record) -> dict | None:
+    """Comparable state of a record or a note."""
+    if record is None:
+        return None
+    return record.as_dict if isinstance(record, Note) else record.model_dump()
+
+
 class Environmenton(type):
     _instances = {}
 
@@ -18,15 +33,38 @@ class Environmenton(type):
 
 class PimpEnvironment(metaclass=Environmenton):
     """Main config storage for all app`s needs"""
+    # LazyBook proxies until the books are loaded
     address_book: AddressBook = None
     note_book: Notebook = None
 
     __address_book_dp: DataProvider = None
     __note_book_dp: DataProvider = None
+    autosaver: AutoSaver = None
+    # seconds spent reading each book, by book class name
+    load_timings: Dict[str, float] = {}
+    __autosave_config: dict = {}
+    # seconds between checks of the data files for outside changes
+    refresh_interval: float = 5
+    # files moved at once by the file sorter
+    sorter_workers: int = 8
+    __file_stamps: Dict[str, tuple] = {}
+    # IDs of records changed in the app since the last save, by book name,
+    # with the book's change counter at the change
+    __local_changes: Dict[str, Dict[int, int]] = {}
+    __syncing: bool = False
+    # IDs of records changed both in the app and outside, by book name,
+    # found by the last apply_changes
+    conflicts: Dict[str, List[int]] = {}
+    __loaded = threading.Event()
 
     __data_providers: Dict[str, DataProvider] = \
         {"file:pickle": PickleDataProvider.PickleDataProvider,
-         "file:json": JsonDataProvider.JsonDataProvider}
+         "file:json": JsonDataProvider.JsonDataProvider,
+         "file:jsonl": JsonlDataProvider.JsonlDataProvider,
+         "file:binary": BinaryDataProvider.BinaryDataProvider,
+         "file:mmap": MmapDataProvider.MmapDataProvider,
+         "file:sqlite": SqliteDataProvider.SqliteDataProvider,
+         "file:journal": JournalDataProvider.JournalDataProvider}
 
     def read_config(self, path):
         if Path(path).exists():
@@ -38,15 +76,175 @@ class PimpEnvironment(metaclass=Environmenton):
             dp = ab_section["provider"]
             con = ab_section["connection"]
             self.__address_book_dp = self.__data_providers[dp](con)
-            self.address_book = self.__address_book_dp.read_data()
+            self.address_book = LazyBook("AddressBook")
 
             dp = nb_section["provider"]
             con = nb_section["connection"]
             self.__note_book_dp = self.__data_providers[dp](con)
-            self.note_book = self.__note_book_dp.read_data()
+            self.note_book = LazyBook("Notebook")
+
+            self.__autosave_config = config.get("Autosave") or {}
+            refresh = config.get("Refresh") or {}
+            self.refresh_interval = refresh.get("interval", 5)
+            sorter = config.get("Sorter") or {}
+            self.sorter_workers = sorter.get("workers", 8)
+            self.__loaded = threading.Event()
+            threading.Thread(target=self._load_books,
+                             name="books loader",
+                             daemon=True).start()
+
+    def _load_books(self) -> None:
+        """Reads all the books at once, each one is handed to its
+        LazyBook proxy as soon as it is read."""
+        jobs = ((self.address_book, self.__address_book_dp, AddressBook),
+                (self.note_book, self.__note_book_dp, Notebook))
+        self.load_timings = {}
+        self.__local_changes = {}
+        with ThreadPoolExecutor(max_workers=len(jobs),
+                                thread_name_prefix="books loader") as pool:
+            books = list(pool.map(lambda job: self._load_book(*job), jobs))
+
+        # interval 0 turns autosave off, books are saved on exit only
+        self.autosaver = AutoSaver(
+            [(book, provider)
+             for book, (_, provider, _) in zip(books, jobs)
+             if book is not None],
+            self.__autosave_config.get("interval", 30),
+            on_saved=self._saved)
+        if self.autosaver.interval > 0:
+            self.autosaver.start()
+        self.__loaded.set()
+
+    def _load_book(self, proxy: LazyBook, provider: DataProvider, book_cls):
+        started = time.perf_counter()
+        self.__file_stamps[book_cls.__name__] = self._file_stamp(provider)
+        try:
+            book = provider.read_data()
+        except Exception as err:
+            book = err
+        self.load_timings[book_cls.__name__] = time.perf_counter() - started
+        if isinstance(book, Exception):
+            proxy.set_error(book)
+            return None
+        if book is None:
+            book = book_cls.detached()
+        self._track_changes(book_cls.__name__, book)
+        proxy.set_book(book)
+        return book
+
+    def _track_changes(self, name: str, book: Book) -> None:
+        """Remembers records changed in the app, they win over
+        outside changes of the same records."""
+        changed = self.__local_changes[name] = {}
+
+        def on_change(action: str, record) -> None:
+            if not self.__syncing:
+                record_id = (record.note_id if isinstance(record, Note)
+                             else record.id)
+                changed[record_id] = book.changes
+
+        book.subscribe(on_change)
+
+    def wait_loaded(self, timeout: float | None = None) -> bool:
+        """Waits till all the books are loaded (or failed to)."""
+        return self.__loaded.wait(timeout)
+
+    def save_data(self) -> bool:
+        """Stops autosave and saves books changed since the last save."""
+        if self.address_book is None:
+            return True
+        # a book loaded first may be changed while the others load
+        self.wait_loaded()
+        if self.autosaver is None:
+            return True
+        self.autosaver.stop()
+        self.autosaver.flush()
+        return all(stats.error is None
+                   for stats in self.autosaver.stats.values())
+
+    def _saved(self, book: Book, provider: DataProvider) -> None:
+        """Own writes are not changes to reload."""
+        name = "Notebook" if isinstance(book, Notebook) else "AddressBook"
+        self.__file_stamps[name] = self._file_stamp(provider)
+        # changes made while saving are still to be saved
+        saved = self.autosaver.saved_changes(book)
+        changed = self.__local_changes.get(name, {})
+        for record_id, change in list(changed.items()):
+            if change <= saved:
+                changed.pop(record_id, None)
+
+    @staticmethod
+    def _file_stamp(provider: DataProvider) -> tuple:
+        """Modification times and sizes of the provider's files."""
+        stamp = []
+        for value in provider.source_description.values():
+            if isinstance(value, Path) and value.exists():
+                stat = value.stat()
+                stamp.append((str(value), stat.st_mtime_ns, stat.st_size))
+        return tuple(stamp)
+
+    def read_changes(self) -> Dict[str, Book]:
+        """Re-reads the books whose files changed since they were
+        looked at last time. Doesn't touch the live books, so it can run
+        in a background thread.
+        A file failed to read is tried again next time."""
+        changes = {}
+        if not self.wait_loaded(0):
+            return changes
+        for name, proxy, provider in (
+                ("AddressBook", self.address_book, self.__address_book_dp),
+                ("Notebook", self.note_book, self.__note_book_dp)):
+            if proxy.failed:
+                # failed to load, nothing to refresh
+                continue
+            stamp = self._file_stamp(provider)
+            if stamp == self.__file_stamps.get(name):
+                continue
+            reader = type(provider)(provider.source_description["connection"])
+            fresh = reader.read_data()
+            if hasattr(reader, "close"):
+                reader.close()
+            if fresh is not None and not isinstance(fresh, Exception):
+                self.__file_stamps[name] = stamp
+                changes[name] = fresh
+        return changes
+
+    def apply_changes(self, changes: Dict[str, Book]) -> Dict[str, BookDiff]:
+        """Applies differences of re-read books into the live ones.
+        Records changed in the app and not saved yet are kept as they
+        are, their outside versions are listed in conflicts."""
+        diffs = {}
+        self.conflicts = {}
+        for name, fresh in changes.items():
+            proxy, provider = ((self.address_book, self.__address_book_dp)
+                               if name == "AddressBook"
+                               else (self.note_book, self.__note_book_dp))
+            book = proxy.wait()
+            dirty = self.autosaver.is_dirty(book)
+            keep = set(self.__local_changes.get(name, ())) if dirty else ()
+            conflicts = [record_id for record_id in sorted(keep)
+                         if record_id in fresh.data
+                         and _as_dict(book.data.get(record_id))
+                         != _as_dict(fresh.data[record_id])]
+            if conflicts:
+                self.conflicts[name] = conflicts
+            self.__syncing = True
+            try:
+                diffs[name] = book.sync_with(fresh, keep)
+            finally:
+                self.__syncing = False
+            if dirty:
+                # own changes are still to be saved along with the new ones
+                continue
+            # the book now is what its files hold, write-through
+            # providers have just written the differences once more
+            self.autosaver.mark_saved(book)
+            self._saved(book, provider)
+        return diffs
 
-    def refresh_data(self):
-        pass
+    def refresh_data(self) -> Dict[str, BookDiff]:
+        """Applies changes made to the data files outside the app."""
+        return self.apply_changes(self.read_changes())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,415 @@
+"""In-memory indexes kept by the books alongside their data"""
+import calendar
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+
+class NameIndex:
+    """Unique name -> record id index.
+
+    Names are compared exactly by default. With `casefold` names differing
+    only in case are treated as the same, with `normalization` (one of
+    "NFC", "NFD", "NFKC", "NFKD") names are Unicode-normalized first.
+    """
+
+    def __init__(self,
+                 casefold: bool = False,
+                 normalization: Optional[str] = None) -> None:
+        self.casefold = casefold
+        self.normalization = normalization
+        self._ids: Dict[str, int] = {}
+        self._keys: Dict[int, str] = {}
+        self._sorted: Optional[List[int]] = None
+
+    def key(self, name: str) -> str:
+        """Return the lookup key for a name."""
+        if self.normalization:
+            name = unicodedata.normalize(self.normalization, name)
+        if self.casefold:
+            name = name.casefold()
+        return name
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, name: str) -> bool:
+        return self.key(name) in self._ids
+
+    def get(self, name: str) -> Optional[int]:
+        """Return id of the record with the given name or None."""
+        return self._ids.get(self.key(name))
+
+    def add(self, record_id: int, name: str) -> None:
+        """Index a name, raises KeyError if it belongs to other record."""
+        key = self.key(name)
+        owner = self._ids.get(key)
+        if owner is not None and owner != record_id:
+            raise KeyError(f"Record {name} already exists")
+        self.discard(record_id)
+        self._ids[key] = record_id
+        self._keys[record_id] = key
+        self._sorted = None
+
+    def discard(self, record_id: int) -> None:
+        """Remove the name of a record from the index if present."""
+        key = self._keys.pop(record_id, None)
+        if key is not None:
+            del self._ids[key]
+            self._sorted = None
+
+    def sorted_ids(self) -> List[int]:
+        """Return ids ordered by name, the list is cached until names
+        change and must not be modified."""
+        if self._sorted is None:
+            self._sorted = [self._ids[key] for key in sorted(self._ids)]
+        return self._sorted
+
+    def clear(self) -> None:
+        self._ids.clear()
+        self._keys.clear()
+        self._sorted = None
+
+
+class TrigramIndex:
+    """Per field trigram -> record ids index for substring search.
+
+    Values are indexed lowercased, so candidates found for a needle are
+    a superset of records containing it case-insensitively and must be
+    checked against the real values afterwards.
+    Records are indexed when added, so a book loaded in the background
+    comes to the UI with the index already built.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Dict[str, Set[int]]] = {}
+        self._values: Dict[int, Dict[str, Tuple[str, ...]]] = {}
+
+    @staticmethod
+    def trigrams(value: str) -> Set[str]:
+        value = value.lower()
+        return {value[i:i + 3] for i in range(len(value) - 2)}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self,
+            record_id: int,
+            fields: Dict[str, Tuple[str, ...]]) -> None:
+        """(Re)index field values of a record."""
+        self.discard(record_id)
+        self._values[record_id] = fields
+        for field, values in fields.items():
+            postings = self._postings.setdefault(field, {})
+            grams = set()
+            for value in values:
+                grams |= self.trigrams(value)
+            for gram in grams:
+                ids = postings.get(gram)
+                if ids is None:
+                    postings[gram] = {record_id}
+                else:
+                    ids.add(record_id)
+
+    def discard(self, record_id: int) -> None:
+        """Remove a record from the index if present."""
+        fields = self._values.pop(record_id, None)
+        if fields is None:
+            return
+        for field, values in fields.items():
+            postings = self._postings[field]
+            grams = set()
+            for value in values:
+                grams |= self.trigrams(value)
+            for gram in grams:
+                ids = postings.get(gram)
+                if ids is None:
+                    continue
+                ids.discard(record_id)
+                if not ids:
+                    del postings[gram]
+
+    def candidates(self, field: str, needle: str) -> Optional[Set[int]]:
+        """Return ids of records whose field may contain the needle.
+
+        None means the index can not narrow the search (needle is shorter
+        than three characters) and every record is a candidate.
+        """
+        grams = self.trigrams(needle)
+        if not grams:
+            return None
+        postings = self._postings.get(field, {})
+        sets = []
+        for gram in grams:
+            ids = postings.get(gram)
+            if not ids:
+                return set()
+            sets.append(ids)
+        sets.sort(key=len)
+        result = set(sets[0])
+        for ids in sets[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._values.clear()
+
+
+class BirthdayIndex:
+    """Index of birthdays by (month, day) for calendar range queries.
+
+    Keeps sorted list of distinct days (366 at most) and record ids for
+    each day, so a range costs a bisect plus the size of the result.
+    In common years Feb 29 birthdays are celebrated on Feb 28.
+    """
+
+    def __init__(self) -> None:
+        self._days: List[Tuple[int, int]] = []
+        self._ids: Dict[Tuple[int, int], Dict[int, None]] = {}
+        self._keys: Dict[int, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, record_id: int, birth_date: Optional[date]) -> None:
+        """(Re)index a birthday, records without one are just dropped."""
+        self.discard(record_id)
+        if birth_date is None:
+            return
+        key = (birth_date.month, birth_date.day)
+        ids = self._ids.get(key)
+        if ids is None:
+            ids = self._ids[key] = {}
+            insort(self._days, key)
+        ids[record_id] = None
+        self._keys[record_id] = key
+
+    def discard(self, record_id: int) -> None:
+        """Remove a record from the index if present."""
+        key = self._keys.pop(record_id, None)
+        if key is None:
+            return
+        ids = self._ids[key]
+        del ids[record_id]
+        if not ids:
+            del self._ids[key]
+            del self._days[bisect_left(self._days, key)]
+
+    def __contains__(self, record_id: int) -> bool:
+        return record_id in self._keys
+
+    def iter_from(self, month: int, day: int) -> Iterator[int]:
+        """Yield ids going around the year from the given day on."""
+        first = bisect_left(self._days, (month, day))
+        for key in self._days[first:] + self._days[:first]:
+            yield from list(self._ids.get(key, ()))
+
+    def _in_year(self, year: int,
+                 start: Tuple[int, int],
+                 end: Tuple[int, int]) -> List[int]:
+        if not calendar.isleap(year) and end == (2, 28):
+            end = (2, 29)
+        first = bisect_left(self._days, start)
+        last = bisect_right(self._days, end)
+        return [record_id
+                for key in self._days[first:last]
+                for record_id in self._ids[key]]
+
+    def between(self, start: date, end: date) -> List[int]:
+        """Return ids of records with birthdays from start to end inclusive.
+
+        Range should be shorter than a year, ids come in chronological
+        order.
+        """
+        if end < start:
+            return []
+        start_key = (start.month, start.day)
+        end_key = (end.month, end.day)
+        if start.year == end.year:
+            return self._in_year(start.year, start_key, end_key)
+        return (self._in_year(start.year, start_key, (12, 31))
+                + self._in_year(end.year, (1, 1), end_key))
+
+    def clear(self) -> None:
+        self._days.clear()
+        self._ids.clear()
+        self._keys.clear()
+
+
+class PhoneIndex:
+    """Phone number -> record ids index with prefix and suffix lookups.
+
+    Exact numbers are kept in a dict. Prefix and suffix lookups use
+    sorted arrays of numbers (and of reversed numbers), built on the first
+    such lookup and then maintained with bisect on every change, so bulk
+    loads do not pay for sorting.
+    """
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, Dict[int, None]] = {}
+        self._numbers: Dict[int, Tuple[str, ...]] = {}
+        self._sorted: Optional[List[str]] = None
+        self._reversed: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, record_id: int, numbers: Tuple[str, ...]) -> None:
+        """(Re)index phone numbers of a record."""
+        self.discard(record_id)
+        if not numbers:
+            return
+        self._numbers[record_id] = numbers
+        for number in numbers:
+            ids = self._ids.get(number)
+            if ids is None:
+                ids = self._ids[number] = {}
+                if self._sorted is not None:
+                    insort(self._sorted, number)
+                    insort(self._reversed, number[::-1])
+            ids[record_id] = None
+
+    def discard(self, record_id: int) -> None:
+        """Remove phone numbers of a record from the index if present."""
+        for number in self._numbers.pop(record_id, ()):
+            ids = self._ids.get(number)
+            if ids is None:
+                continue
+            ids.pop(record_id, None)
+            if not ids:
+                del self._ids[number]
+                if self._sorted is not None:
+                    del self._sorted[bisect_left(self._sorted, number)]
+                    reversed_number = number[::-1]
+                    del self._reversed[bisect_left(self._reversed,
+                                                   reversed_number)]
+
+    def find(self, number: str) -> List[int]:
+        """Return ids of records having exactly this number."""
+        return list(self._ids.get(number, ()))
+
+    @staticmethod
+    def _starting_with(numbers: List[str], prefix: str) -> List[str]:
+        first = bisect_left(numbers, prefix)
+        last = bisect_left(numbers, prefix + "\U0010ffff", first)
+        return numbers[first:last]
+
+    def _build(self) -> None:
+        if self._sorted is None:
+            self._sorted = sorted(self._ids)
+            self._reversed = sorted(number[::-1] for number in self._ids)
+
+    def with_prefix(self, prefix: str) -> List[int]:
+        """Return ids of records having a number starting with prefix."""
+        self._build()
+        ids = {}
+        for number in self._starting_with(self._sorted, prefix):
+            ids.update(self._ids[number])
+        return list(ids)
+
+    def with_suffix(self, suffix: str) -> List[int]:
+        """Return ids of records having a number ending with suffix."""
+        self._build()
+        ids = {}
+        for reversed_number in self._starting_with(self._reversed,
+                                                   suffix[::-1]):
+            ids.update(self._ids[reversed_number[::-1]])
+        return list(ids)
+
+    def clear(self) -> None:
+        self._ids.clear()
+        self._numbers.clear()
+        self._sorted = None
+        self._reversed = None
+
+
+class WordIndex:
+    """Inverted index word -> {note id: word positions} over note texts.
+
+    Words are lower-cased runs of letters and digits. Sorted vocabulary
+    for prefix lookups is built on the first such lookup and then kept
+    sorted on every change.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Dict[int, List[int]]] = {}
+        self._words: Dict[int, Set[str]] = {}
+        self._vocabulary: Optional[List[str]] = None
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return re.findall(r"\w+", text.lower())
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def add(self, note_id: int, text: str) -> None:
+        """(Re)index a text of a note."""
+        self.discard(note_id)
+        words = set()
+        for position, word in enumerate(self.tokenize(text)):
+            notes = self._postings.get(word)
+            if notes is None:
+                notes = self._postings[word] = {}
+                if self._vocabulary is not None:
+                    insort(self._vocabulary, word)
+            notes.setdefault(note_id, []).append(position)
+            words.add(word)
+        self._words[note_id] = words
+
+    def discard(self, note_id: int) -> None:
+        """Remove a note from the index if present."""
+        for word in self._words.pop(note_id, ()):
+            notes = self._postings[word]
+            del notes[note_id]
+            if not notes:
+                del self._postings[word]
+                if self._vocabulary is not None:
+                    del self._vocabulary[bisect_left(self._vocabulary,
+                                                     word)]
+
+    def with_word(self, word: str) -> Set[int]:
+        """Return ids of notes containing the whole word."""
+        return set(self._postings.get(word.lower(), ()))
+
+    def with_prefix(self, prefix: str) -> Set[int]:
+        """Return ids of notes containing a word starting with prefix."""
+        prefix = prefix.lower()
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        first = bisect_left(self._vocabulary, prefix)
+        last = bisect_left(self._vocabulary, prefix + "\U0010ffff", first)
+        ids = set()
+        for word in self._vocabulary[first:last]:
+            ids.update(self._postings[word])
+        return ids
+
+    def with_phrase(self, phrase: str) -> Set[int]:
+        """Return ids of notes containing the words of phrase in a row."""
+        words = self.tokenize(phrase)
+        if not words:
+            return set()
+        postings = [self._postings.get(word) for word in words]
+        if not all(postings):
+            return set()
+        candidates = set(min(postings, key=len))
+        for notes in postings:
+            candidates &= notes.keys()
+        found = set()
+        for note_id in candidates:
+            positions = [set(notes[note_id]) for notes in postings]
+            if any(all(start + shift in positions[shift]
+                       for shift in range(1, len(words)))
+                   for start in postings[0][note_id]):
+                found.add(note_id)
+        return found
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._words.clear()
+        self._vocabulary = None
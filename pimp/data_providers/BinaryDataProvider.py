@@ -0,0 +1,206 @@
+from interfaces.DataProviderABC import DataProvider
+from modules.errors import DataProviderError, ChecksumError
+from cls.AddressBook import AddressBook, Record, Address, Phone, Birthday
+from cls.NoteBook import Notebook, Note
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List
+import gc
+import os
+import struct
+import zlib
+
+# Layout (little-endian):
+#   header: magic, version, book kind, record count, string count,
+#           crc32 of the rest of the file
+#   string table: string count + 1 offsets (in characters) into
+#           the UTF-8 blob of all the distinct strings, then the blob
+#   records: fixed part + string indexes of the phones or tags
+MAGIC = b"PIMB"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHBxIII")
+BLOB_SIZE = struct.Struct("<I")
+# id, flags, name, email, country, zip, city, street, house, apartment,
+# birthday ordinal (0 - no birthday), phone count
+RECORD = struct.Struct("<IBIIIIIIIIIH")
+# note_id, content, tag count
+NOTE = struct.Struct("<QIH")
+NO_STRING = 0xFFFFFFFF
+HAS_ADDRESS = 1
+HAS_PHONES = 2
+KINDS = {"AddressBook": 0, "Notebook": 1}
+ADDRESS_FIELDS = ("country", "zip", "city", "street", "house", "apartment")
+
+
+class _StringTable:
+    """Collects distinct strings while records are packed."""
+    def __init__(self) -> None:
+        self.index: Dict[str, int] = {}
+
+    def __call__(self, value: str | None) -> int:
+        if value is None:
+            return NO_STRING
+        return self.index.setdefault(value, len(self.index))
+
+    def pack(self) -> bytes:
+        offsets = [0]
+        for value in self.index:
+            offsets.append(offsets[-1] + len(value))
+        blob = "".join(self.index).encode("utf-8")
+        return (struct.pack(f"<{len(offsets)}I", *offsets)
+                + BLOB_SIZE.pack(len(blob)) + blob)
+
+
+def construct_trusted(model_cls, fields: dict):
+    """Lean model_construct for trusted data with every field given:
+    sets the model state directly, as unpickling does."""
+    obj = model_cls.__new__(model_cls)
+    object.__setattr__(obj, "__dict__", fields)
+    object.__setattr__(obj, "__pydantic_fields_set__", set(fields))
+    object.__setattr__(obj, "__pydantic_extra__", None)
+    object.__setattr__(obj, "__pydantic_private__", None)
+    return obj
+
+
+class BinaryDataProvider(DataProvider):
+    """Provides read/write operation with a compact binary format.
+
+    Records are struct-packed with their strings kept once in a string
+    table. Data written by the provider is trusted on read: models are
+    constructed without validation.
+    """
+    def __init__(self, path) -> None:
+        self.__connection = Path(path)
+        self.source = "file:binary"
+
+    @property
+    def source_description(self) -> dict:
+        return {"connection": self.__connection,
+                "source": self.source}
+
+    def update_data(self, data: Any) -> bool:
+        return self.write_data(data)
+
+    def read_data(self) -> Any:
+        obj_path: Path = self.__connection
+        if obj_path.exists():
+            # nothing to collect among freshly made records, but
+            # making them would trigger full collections repeatedly
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                return self._unpack(obj_path.read_bytes())
+            except Exception as err:
+                return err
+            finally:
+                if gc_enabled:
+                    gc.enable()
+
+    def write_data(self, data: Any) -> bool:
+        obj_path = self.__connection
+        tmp_path = obj_path.with_name(obj_path.name + ".tmp")
+        try:
+            content = self._pack(data)
+            with tmp_path.open("wb") as fout:
+                fout.write(content)
+                fout.flush()
+                os.fsync(fout.fileno())
+            os.replace(tmp_path, obj_path)
+        except Exception as err:
+            tmp_path.unlink(missing_ok=True)
+            raise DataProviderError(f"Can't write {obj_path}: {err}") from err
+        self.bytes_written += len(content)
+        return True
+
+    @staticmethod
+    def _pack(book) -> bytes:
+        strings = _StringTable()
+        body = bytearray()
+        items = list(book.data.values())
+        if isinstance(book, AddressBook):
+            for record in items:
+                address = record.address
+                phones = record.phones or []
+                flags = ((HAS_ADDRESS if address is not None else 0)
+                         | (HAS_PHONES if record.phones is not None else 0))
+                body += RECORD.pack(
+                    record.id, flags, strings(record.name),
+                    strings(record.email),
+                    *(strings(getattr(address, field, None))
+                      for field in ADDRESS_FIELDS),
+                    record.birthday.date.toordinal()
+                    if record.birthday else 0,
+                    len(phones))
+                body += struct.pack(f"<{len(phones)}I",
+                                    *(strings(phone.number)
+                                      for phone in phones))
+        else:
+            for note in items:
+                tags = sorted(note.tags)
+                body += NOTE.pack(note.note_id, strings(note.content),
+                                  len(tags))
+                body += struct.pack(f"<{len(tags)}I", *map(strings, tags))
+        rest = strings.pack() + body
+        return HEADER.pack(MAGIC, FORMAT_VERSION, KINDS[type(book).__name__],
+                           len(items), len(strings.index),
+                           zlib.crc32(rest)) + rest
+
+    @staticmethod
+    def _unpack(content: bytes):
+        magic, version, kind, count, string_count, crc = \
+            HEADER.unpack_from(content)
+        if magic != MAGIC:
+            raise DataProviderError("Not a binary book file")
+        if version != FORMAT_VERSION:
+            raise DataProviderError(f"Unsupported format version {version}")
+        view = memoryview(content)
+        if zlib.crc32(view[HEADER.size:]) != crc:
+            raise ChecksumError("Binary book checksum mismatch")
+
+        pos = HEADER.size
+        offsets = struct.unpack_from(f"<{string_count + 1}I", content, pos)
+        pos += 4 * (string_count + 1)
+        (blob_size,) = BLOB_SIZE.unpack_from(content, pos)
+        pos += BLOB_SIZE.size
+        blob = str(view[pos:pos + blob_size], "utf-8")
+        pos += blob_size
+        strings: List[str | None] = [blob[offsets[i]:offsets[i + 1]]
+                                     for i in range(string_count)]
+
+        def text(index: int) -> str | None:
+            return None if index == NO_STRING else strings[index]
+
+        if kind == KINDS["AddressBook"]:
+            book = AddressBook.detached()
+            for _ in range(count):
+                (record_id, flags, name, email, *address, bday,
+                 phone_count) = RECORD.unpack_from(content, pos)
+                pos += RECORD.size
+                phones = struct.unpack_from(f"<{phone_count}I", content, pos)
+                pos += 4 * phone_count
+                book.restore_record(construct_trusted(Record, {
+                    "id": record_id,
+                    "name": strings[name],
+                    "birthday": construct_trusted(Birthday, {
+                        "date": date.fromordinal(bday)}) if bday else None,
+                    "email": text(email),
+                    "address": construct_trusted(Address, dict(
+                        zip(ADDRESS_FIELDS, map(text, address))))
+                    if flags & HAS_ADDRESS else None,
+                    "phones": [construct_trusted(Phone, {"number": strings[phone]})
+                               for phone in phones]
+                    if flags & HAS_PHONES else None}))
+        else:
+            book = Notebook.detached()
+            for _ in range(count):
+                note_id, content_index, tag_count = NOTE.unpack_from(content,
+                                                                     pos)
+                pos += NOTE.size
+                tags = struct.unpack_from(f"<{tag_count}I", content, pos)
+                pos += 4 * tag_count
+                note = Note()
+                note.note_id = note_id
+                note.content = strings[content_index]
+                note.tags = {strings[tag] for tag in tags}
+                book.add_record(note)
+        return book
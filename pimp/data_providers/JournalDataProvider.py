@@ -0,0 +1,231 @@
+from interfaces.DataProviderABC import DataProvider
+from modules.errors import DataProviderError
+from data_providers.PickleDataProvider import PickleDataProvider
+from cls.AddressBook import AddressBook, Record
+from cls.NoteBook import Notebook, Note
+from pathlib import Path
+from typing import Any
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class JournalDataProvider(DataProvider):
+    """Keeps a book as a pickle snapshot plus an append-only journal.
+
+    Every add/edit/delete of the read book is appended to the journal
+    (path + ".journal") as one JSON line, the journal is fsync'ed at most
+    once per fsync_interval seconds. Once compact_every entries are
+    journaled, the next update_data (e.g. by the autosaver thread) writes
+    the book to the snapshot and the journal starts over. While the
+    snapshot is written, new changes go to a fresh journal and the old one
+    is kept aside (path + ".journal.old") till the snapshot is in place.
+    """
+    def __init__(self,
+                 path,
+                 compact_every: int = 1000,
+                 fsync_interval: float = 1.0) -> None:
+        self.__connection = Path(path)
+        self.__journal = Path(f"{path}.journal")
+        self.__old_journal = Path(f"{path}.journal.old")
+        self._snapshot = PickleDataProvider(path)
+        self.source = "file:journal"
+        self.compact_every = compact_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._book = None
+        self._fout = None
+        self._entries = 0
+        self._synced_at = 0.0
+        self._write_failed = False
+        self._journal_bytes = 0
+
+    @property
+    def bytes_written(self) -> int:
+        return self._journal_bytes + self._snapshot.bytes_written
+
+    @property
+    def source_description(self) -> dict:
+        return {"connection": self.__connection,
+                "journal": self.__journal,
+                "source": self.source}
+
+    def read_data(self) -> Any:
+        book = None
+        with self._lock:
+            try:
+                book = self._snapshot.read_data()
+                if isinstance(book, Exception):
+                    raise book
+                for journal in (self.__old_journal, self.__journal):
+                    if journal.exists():
+                        book = self._replay(book, journal)
+            except Exception as err:
+                return err
+            if book is not None:
+                self._attach(book)
+        return book
+
+    def write_data(self, data: Any) -> bool:
+        """Writes the snapshot and starts the journal over."""
+        self._compact(data)
+        with self._lock:
+            if self._book is not data:
+                self._attach(data)
+        return True
+
+    def update_data(self, data: Any) -> bool:
+        """Attached book only needs its journal synced, unless it is
+        time to compact it or journaling a change failed."""
+        if self._book is not data:
+            return self.write_data(data)
+        with self._lock:
+            compact = (self._write_failed
+                       or self._entries >= self.compact_every)
+            if not compact:
+                try:
+                    self._sync()
+                except OSError as err:
+                    raise DataProviderError(
+                        f"Can't write {self.__journal}: {err}") from err
+        if compact:
+            self._compact(data)
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            if self._book is not None:
+                self._book.unsubscribe(self._on_change)
+                self._book = None
+            if self._fout is not None:
+                self._sync()
+                self._fout.close()
+                self._fout = None
+
+    def _attach(self, book) -> None:
+        if self._book is not None:
+            self._book.unsubscribe(self._on_change)
+        self._book = book
+        book.subscribe(self._on_change)
+
+    def _replay(self, book, journal: Path):
+        """Applies journal entries on top of the snapshot.
+
+        Entries are put into the book data by id and the book is
+        reindexed once at the end, so entries the snapshot already has
+        (e.g. after a crash while compacting) replay to the same state.
+        Changing the book one entry at a time would fail on them, e.g. on
+        a record renamed and its old name given to a new one."""
+        replayed = False
+        with journal.open("r", encoding="utf-8") as fin:
+            for line in fin:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # a line cut by a crash, the old journal may go on
+                    # with the entries of the next one after it
+                    continue
+                if "book" in entry:
+                    if book is None:
+                        book = (AddressBook.detached()
+                                if entry["book"] == "AddressBook"
+                                else Notebook.detached())
+                    continue
+                if isinstance(book, AddressBook):
+                    record = Record.model_validate(entry["record"])
+                    record_id = record.id
+                else:
+                    record = Note.from_dict(entry["record"])
+                    record_id = record.note_id
+                if entry["op"] == "delete":
+                    book.data.pop(record_id, None)
+                else:
+                    book.data[record_id] = record
+                replayed = True
+                self._entries += 1
+        if replayed:
+            book._reindex()
+        return book
+
+    def _journal_out(self):
+        if self._fout is None:
+            self._fout = self.__journal.open("a", encoding="utf-8")
+        return self._fout
+
+    def _on_change(self, action: str, record) -> None:
+        if isinstance(record, Record):
+            dumped = record.model_dump(mode="json")
+        else:
+            dumped = record.as_dict
+        with self._lock:
+            try:
+                fout = self._journal_out()
+                line = json.dumps({"op": action, "record": dumped},
+                                  ensure_ascii=False) + "\n"
+                fout.write(line)
+                fout.flush()
+                self._journal_bytes += len(line.encode("utf-8"))
+                self._entries += 1
+                if time.monotonic() - self._synced_at >= self.fsync_interval:
+                    self._sync()
+            except OSError as err:
+                # the book is changed already, it is compacted next time
+                logger.error("Can't journal %s to %s: %s",
+                             action, self.__journal, err)
+                self._write_failed = True
+
+    def _sync(self) -> None:
+        if self._fout is not None:
+            self._fout.flush()
+            os.fsync(self._fout.fileno())
+        self._synced_at = time.monotonic()
+
+    def _compact(self, book) -> None:
+        """Writes the snapshot and drops the journals it covers.
+
+        Only moving the journal aside holds up changes of the book, the
+        snapshot is written meanwhile. Changes journaled both before and
+        after the snapshot are just replayed twice."""
+        with self._compact_lock:
+            with self._lock:
+                try:
+                    self._rotate(book)
+                except OSError as err:
+                    self._write_failed = True
+                    raise DataProviderError(
+                        f"Can't write {self.__journal}: {err}") from err
+            try:
+                self._snapshot.write_data(book)
+            except DataProviderError:
+                self._write_failed = True
+                raise
+            self.__old_journal.unlink(missing_ok=True)
+
+    def _rotate(self, book) -> None:
+        """Moves the journal aside and starts a new one."""
+        if self._fout is not None:
+            self._fout.close()
+            self._fout = None
+        if self.__journal.exists():
+            if self.__old_journal.exists():
+                # last compaction failed, both journals are needed still
+                with self.__journal.open("r", encoding="utf-8") as fin, \
+                        self.__old_journal.open("a", encoding="utf-8") as fout:
+                    for line in fin:
+                        fout.write(line)
+                        self._journal_bytes += len(line.encode("utf-8"))
+                self.__journal.unlink()
+            else:
+                os.replace(self.__journal, self.__old_journal)
+        self._fout = self.__journal.open("w", encoding="utf-8")
+        header = json.dumps({"book": type(book).__name__}) + "\n"
+        self._fout.write(header)
+        self._journal_bytes += len(header)
+        self._sync()
+        self._entries = 0
+        self._write_failed = False
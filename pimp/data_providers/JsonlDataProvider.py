@@ -0,0 +1,74 @@
+from interfaces.DataProviderABC import DataProvider
+from modules.errors import DataProviderError
+from cls.AddressBook import AddressBook, Record
+from cls.NoteBook import Notebook, Note
+from pathlib import Path
+from typing import Any
+import json
+import os
+
+
+FORMAT_VERSION = 1
+
+
+class JsonlDataProvider(DataProvider):
+    """Provides read/write operation with JSON Lines: a header line
+    {"book": ..., "version": ...} followed by one record per line.
+    Records are streamed both ways, the file is never held in memory."""
+    def __init__(self, path) -> None:
+        self.__connection = Path(path)
+        self.source = "file:jsonl"
+
+    @property
+    def source_description(self) -> dict:
+        return {"connection": self.__connection,
+                "source": self.source}
+
+    def read_data(self) -> Any:
+        obj_path: Path = self.__connection
+        if not obj_path.exists():
+            return None
+        with obj_path.open("r", encoding="utf-8") as fin:
+            try:
+                header = json.loads(fin.readline())
+                if header.get("version") != FORMAT_VERSION:
+                    raise ValueError(f"Unsupported version "
+                                     f"{header.get('version')}")
+                if header["book"] == "AddressBook":
+                    book = AddressBook.detached()
+                    for line in fin:
+                        book.restore_record(Record.model_validate_json(line))
+                else:
+                    book = Notebook.detached()
+                    for line in fin:
+                        book.add_record(Note.from_dict(json.loads(line)))
+            except Exception as err:
+                return err
+        return book
+
+    def write_data(self, data: Any) -> bool:
+        obj_path = self.__connection
+        tmp_path = obj_path.with_name(obj_path.name + ".tmp")
+        if isinstance(data, AddressBook):
+            lines = (record.model_dump_json() + "\n"
+                     for record in list(data.data.values()))
+        else:
+            lines = (json.dumps(note.as_dict, ensure_ascii=False) + "\n"
+                     for note in list(data.data.values()))
+        try:
+            with tmp_path.open("w", encoding="utf-8") as fout:
+                fout.write(json.dumps({"book": type(data).__name__,
+                                       "version": FORMAT_VERSION}) + "\n")
+                fout.writelines(lines)
+                size = fout.tell()
+                fout.flush()
+                os.fsync(fout.fileno())
+            os.replace(tmp_path, obj_path)
+        except Exception as err:
+            tmp_path.unlink(missing_ok=True)
+            raise DataProviderError(f"Can't write {obj_path}: {err}") from err
+        self.bytes_written += size
+        return True
+
+    def update_data(self, data: Any) -> bool:
+        return self.write_data(data)
@@ -0,0 +1,260 @@
+from interfaces.DataProviderABC import DataProvider
+from modules.errors import DataProviderError
+from data_providers.BinaryDataProvider import construct_trusted
+from cls.AddressBook import Record, Address, Phone, Birthday
+from cls.MappedAddressBook import MappedAddressBook
+from bisect import bisect_left, bisect_right
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Tuple
+import mmap
+import os
+import struct
+import sys
+
+# Layout (little-endian, arrays 8-byte aligned):
+#   header
+#   records, each one: id, flags, birthday ordinal (0 - none), then
+#       length-prefixed name, email, address fields, phone count, phones
+#   ids: record ids ascending, offsets: record offsets in the same order
+#   names: record positions (in ids order) sorted by name
+#   birthday keys (month * 32 + day) ascending, birthday record positions
+MAGIC = b"PIMM"
+FORMAT_VERSION = 1
+# magic, version, record count, birthday count, offsets of ids, offsets,
+# names, birthday keys and birthday positions arrays
+HEADER = struct.Struct("<4sHxxIIxxxxQQQQQ")
+RECORD = struct.Struct("<IBi")
+LENGTH = struct.Struct("<I")
+PHONE_COUNT = struct.Struct("<H")
+NO_STRING = 0xFFFFFFFF
+HAS_ADDRESS = 1
+HAS_PHONES = 2
+ADDRESS_FIELDS = ("country", "zip", "city", "street", "house", "apartment")
+
+
+def _day_key(month: int, day: int) -> int:
+    return month * 32 + day
+
+
+def _pack_string(value: str | None) -> bytes:
+    if value is None:
+        return LENGTH.pack(NO_STRING)
+    encoded = value.encode("utf-8")
+    return LENGTH.pack(len(encoded)) + encoded
+
+
+def _pack_record(record: Record) -> bytes:
+    address = record.address
+    phones = record.phones or []
+    flags = ((HAS_ADDRESS if address is not None else 0)
+             | (HAS_PHONES if record.phones is not None else 0))
+    parts = [RECORD.pack(record.id, flags,
+                         record.birthday.date.toordinal()
+                         if record.birthday else 0),
+             _pack_string(record.name),
+             _pack_string(record.email)]
+    parts += [_pack_string(getattr(address, field, None))
+              for field in ADDRESS_FIELDS]
+    parts.append(PHONE_COUNT.pack(len(phones)))
+    parts += [_pack_string(phone.number) for phone in phones]
+    return b"".join(parts)
+
+
+def _align(fout) -> None:
+    fout.write(bytes(-fout.tell() % 8))
+
+
+class ContactStore:
+    """Read-only view of a contact file mapped into memory.
+
+    Only the header is read on open, records and index entries are
+    paged in by the OS when they are looked at.
+    """
+
+    def __init__(self, path: Path) -> None:
+        if sys.byteorder != "little":
+            raise DataProviderError("Mapped books need little-endian CPU")
+        with path.open("rb") as fin:
+            self._mm = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.count, bday_count, ids_at, offsets_at,
+         names_at, bday_keys_at, bday_pos_at) = HEADER.unpack_from(self._mm)
+        # records end where the arrays begin
+        self._records_end = ids_at
+        if magic != MAGIC:
+            raise DataProviderError("Not a mapped book file")
+        if version != FORMAT_VERSION:
+            raise DataProviderError(f"Unsupported format version {version}")
+        view = self._view = memoryview(self._mm)
+        self.ids = view[ids_at:ids_at + 4 * self.count].cast("I")
+        self._offsets = view[offsets_at:
+                             offsets_at + 8 * self.count].cast("Q")
+        self._names = view[names_at:names_at + 4 * self.count].cast("I")
+        self._bday_keys = view[bday_keys_at:
+                               bday_keys_at + 4 * bday_count].cast("I")
+        self._bday_pos = view[bday_pos_at:
+                              bday_pos_at + 4 * bday_count].cast("I")
+
+    def close(self) -> None:
+        for array in (self.ids, self._offsets, self._names,
+                      self._bday_keys, self._bday_pos, self._view):
+            array.release()
+        self._mm.close()
+
+    def position(self, record_id: int) -> Optional[int]:
+        """Position of the record in ids order, None if there is none."""
+        pos = bisect_left(self.ids, record_id)
+        if pos < self.count and self.ids[pos] == record_id:
+            return pos
+        return None
+
+    def raw(self, pos: int) -> bytes:
+        """Encoded record, for comparing versions of a store."""
+        end = (self._offsets[pos + 1] if pos + 1 < self.count
+               else self._records_end)
+        return self._mm[self._offsets[pos]:end]
+
+    def _string(self, offset: int) -> Tuple[str | None, int]:
+        (length,) = LENGTH.unpack_from(self._mm, offset)
+        offset += LENGTH.size
+        if length == NO_STRING:
+            return None, offset
+        return (str(self._mm[offset:offset + length], "utf-8"),
+                offset + length)
+
+    def name(self, pos: int) -> str:
+        return self._string(self._offsets[pos] + RECORD.size)[0]
+
+    def record(self, pos: int) -> Record:
+        offset = self._offsets[pos]
+        record_id, flags, bday = RECORD.unpack_from(self._mm, offset)
+        offset += RECORD.size
+        values = []
+        for _ in range(2 + len(ADDRESS_FIELDS)):
+            value, offset = self._string(offset)
+            values.append(value)
+        (phone_count,) = PHONE_COUNT.unpack_from(self._mm, offset)
+        offset += PHONE_COUNT.size
+        phones = []
+        for _ in range(phone_count):
+            number, offset = self._string(offset)
+            phones.append(construct_trusted(Phone, {"number": number}))
+        return construct_trusted(Record, {
+            "id": record_id,
+            "name": values[0],
+            "birthday": construct_trusted(Birthday, {
+                "date": date.fromordinal(bday)}) if bday else None,
+            "email": values[1],
+            "address": construct_trusted(Address, dict(
+                zip(ADDRESS_FIELDS, values[2:])))
+            if flags & HAS_ADDRESS else None,
+            "phones": phones if flags & HAS_PHONES else None})
+
+    def find_name(self, name: str) -> Optional[int]:
+        """Position of the record with exactly this name."""
+        at = bisect_left(self._names, name, key=self.name)
+        if at < self.count and self.name(self._names[at]) == name:
+            return self._names[at]
+        return None
+
+    def by_name(self) -> Iterator[int]:
+        return iter(self._names)
+
+    def birthdays(self, start: Tuple[int, int],
+                  end: Tuple[int, int]) -> List[int]:
+        """Positions of records with birthdays from start to end
+        (month, day) inclusive, in calendar order."""
+        first = bisect_left(self._bday_keys, _day_key(*start))
+        last = bisect_right(self._bday_keys, _day_key(*end))
+        return list(self._bday_pos[first:last])
+
+    def birthdays_from(self, month: int, day: int) -> List[int]:
+        """Positions of records with birthdays going around the year
+        from the given day on."""
+        first = bisect_left(self._bday_keys, _day_key(month, day))
+        return list(self._bday_pos[first:]) + list(self._bday_pos[:first])
+
+    def without_birthday(self) -> Iterator[int]:
+        with_birthday = set(self._bday_pos)
+        return (pos for pos in range(self.count) if pos not in with_birthday)
+
+    @staticmethod
+    def write(path: Path, records: List[Record]) -> int:
+        """Writes records with their indexes, atomically.
+        Returns the size of the file."""
+        records = sorted(records, key=lambda record: record.id)
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            with tmp_path.open("wb") as fout:
+                fout.write(bytes(HEADER.size))
+                offsets = []
+                for record in records:
+                    offsets.append(fout.tell())
+                    fout.write(_pack_record(record))
+                sections = []
+                by_name = sorted(range(len(records)),
+                                 key=lambda pos: records[pos].name)
+                by_day = sorted(
+                    (_day_key(record.birthday.date.month,
+                              record.birthday.date.day), pos)
+                    for pos, record in enumerate(records) if record.birthday)
+                for code, values in (
+                        ("I", [record.id for record in records]),
+                        ("Q", offsets),
+                        ("I", by_name),
+                        ("I", [key for key, _ in by_day]),
+                        ("I", [pos for _, pos in by_day])):
+                    _align(fout)
+                    sections.append(fout.tell())
+                    fout.write(struct.pack(f"<{len(values)}{code}", *values))
+                size = fout.tell()
+                fout.seek(0)
+                fout.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(records),
+                                       len(by_day), *sections))
+                fout.flush()
+                os.fsync(fout.fileno())
+            os.replace(tmp_path, path)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return size
+
+
+class MmapDataProvider(DataProvider):
+    """Provides read-only contact books mapped into memory.
+
+    Opening costs the same for any size of the book: records are read
+    only when looked at. write_data builds the file from any address book.
+    """
+    def __init__(self, path) -> None:
+        self.__connection = Path(path)
+        self.source = "file:mmap"
+
+    @property
+    def source_description(self) -> dict:
+        return {"connection": self.__connection,
+                "source": self.source}
+
+    def read_data(self) -> Any:
+        obj_path: Path = self.__connection
+        if obj_path.exists():
+            try:
+                return MappedAddressBook.detached(ContactStore(obj_path))
+            except Exception as err:
+                return err
+
+    def write_data(self, data: Any) -> bool:
+        try:
+            size = ContactStore.write(self.__connection,
+                                      list(data.data.values()))
+        except Exception as err:
+            raise DataProviderError(
+                f"Can't write {self.__connection}: {err}") from err
+        self.bytes_written += size
+        return True
+
+    def update_data(self, data: Any) -> bool:
+        if isinstance(data, MappedAddressBook):
+            # read-only books never change
+            return True
+        return self.write_data(data)
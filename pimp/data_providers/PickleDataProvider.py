@@ -1,11 +1,40 @@
 from interfaces.DataProviderABC import DataProvider
+from modules.errors import DataProviderError, ChecksumError
 from pathlib import Path
 from typing import Any
 from pickle import load, dump
+import hashlib
+import os
+import struct
+
+# magic, format version, record count, payload length, sha256 of payload
+MAGIC = b"PIMP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct(">4sHQQ32s")
+CHUNK_SIZE = 1 << 16
+
+
+class _HashingWriter:
+    """File wrapper counting and hashing everything written."""
+    def __init__(self, fout) -> None:
+        self.fout = fout
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk) -> int:
+        self.sha256.update(chunk)
+        self.size += len(chunk)
+        return self.fout.write(chunk)
 
 
 class PickleDataProvider(DataProvider):
-    """Provides read/write operation with pickle.load/pickle.dump"""
+    """Provides read/write operation with pickle.load/pickle.dump.
+
+    Snapshot starts with a header holding format version, record count
+    and sha256 of the pickled data. It is written to a temp file and
+    renamed over the old one, so the old snapshot survives a failed write.
+    Files without the header (older snapshots) are read as plain pickle.
+    """
     def __init__(self, path) -> None:
         self.__connection = Path(path)
         self.source = "file:pickle"
@@ -16,23 +45,81 @@ class PickleDataProvider(DataProvider):
                 "source": self.source}
 
     def update_data(self, data) -> bool:
-        return True
+        return self.write_data(data)
 
     def read_data(self) -> Any:
         obj_path: Path = self.__connection
         if obj_path.exists():
             with obj_path.open("rb") as fin:
                 try:
-                    obj = load(fin)
+                    obj = self._load(fin)
                 except Exception as err:
                     return err
             return obj
 
+    @staticmethod
+    def _load(fin) -> Any:
+        header = fin.read(HEADER.size)
+        if not header.startswith(MAGIC):
+            fin.seek(0)
+            return load(fin)
+        if len(header) < HEADER.size:
+            raise ChecksumError("Snapshot header is cut")
+        _, version, count, size, checksum = HEADER.unpack(header)
+        if version != FORMAT_VERSION:
+            raise DataProviderError(f"Unsupported snapshot version {version}")
+
+        # the whole payload is checked before anything gets unpickled
+        sha256 = hashlib.sha256()
+        left = size
+        while left:
+            chunk = fin.read(min(CHUNK_SIZE, left))
+            if not chunk:
+                raise ChecksumError("Snapshot is cut")
+            sha256.update(chunk)
+            left -= len(chunk)
+        if sha256.digest() != checksum:
+            raise ChecksumError("Snapshot checksum mismatch")
+
+        fin.seek(HEADER.size)
+        obj = load(fin)
+        if len(getattr(obj, "data", ())) != count:
+            raise ChecksumError(f"Snapshot has {len(obj.data)} records "
+                                f"instead of {count}")
+        return obj
+
     def write_data(self, data: Any) -> bool:
         obj_path = self.__connection
-        with obj_path.open("wb") as fout:
-            try:
-                dump(data, fout)
-            except Exception:
-                return False
+        tmp_path = obj_path.with_name(obj_path.name + ".tmp")
+        try:
+            with tmp_path.open("wb") as fout:
+                fout.write(bytes(HEADER.size))
+                writer = _HashingWriter(fout)
+                dump(data, writer)
+                fout.seek(0)
+                fout.write(HEADER.pack(MAGIC, FORMAT_VERSION,
+                                       len(getattr(data, "data", ())),
+                                       writer.size, writer.sha256.digest()))
+                fout.flush()
+                os.fsync(fout.fileno())
+            os.replace(tmp_path, obj_path)
+            self._sync_dir(obj_path.parent)
+        except Exception as err:
+            tmp_path.unlink(missing_ok=True)
+            raise DataProviderError(f"Can't write {obj_path}: {err}") from err
+        self.bytes_written += HEADER.size + writer.size
         return True
+
+    @staticmethod
+    def _sync_dir(path: Path) -> None:
+        """Makes the rename itself durable (where directories can be opened)."""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
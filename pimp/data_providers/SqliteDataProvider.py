@@ -0,0 +1,254 @@
+from interfaces.DataProviderABC import DataProvider
+from modules.errors import DataProviderError
+from cls.AddressBook import AddressBook, Record, SearchPlan
+from cls.NoteBook import Notebook, Note
+from pathlib import Path
+from typing import Any, Iterable, List, Optional
+import json
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta(key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS contacts(
+    id INTEGER PRIMARY KEY,
+    name TEXT, address TEXT, email TEXT, phones TEXT, bday TEXT,
+    record TEXT NOT NULL);
+CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+    name, address, email, phones, bday,
+    content='contacts', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS contacts_ai AFTER INSERT ON contacts BEGIN
+    INSERT INTO contacts_fts(rowid, name, address, email, phones, bday)
+    VALUES (new.id, new.name, new.address, new.email, new.phones, new.bday);
+END;
+CREATE TRIGGER IF NOT EXISTS contacts_ad AFTER DELETE ON contacts BEGIN
+    INSERT INTO contacts_fts(contacts_fts, rowid,
+                             name, address, email, phones, bday)
+    VALUES ('delete', old.id,
+            old.name, old.address, old.email, old.phones, old.bday);
+END;
+CREATE TABLE IF NOT EXISTS notes(
+    id INTEGER PRIMARY KEY, content TEXT, tags TEXT);
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    content, content='notes', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 0');
+CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts(rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, content)
+    VALUES ('delete', old.id, old.content);
+END;
+"""
+
+# find_record field -> contacts_fts column
+FTS_COLUMNS = {"NAME": "name",
+               "ADDRESS": "address",
+               "EMAIL": "email",
+               "PHONES": "phones",
+               "BDAY": "bday"}
+
+
+def _fts_string(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+class SqliteDataProvider(DataProvider):
+    """Keeps a book in SQLite database with FTS5 indexes for searching.
+
+    Read book stays attached to the database: every change of the book
+    is written through at once, and find_record/find_notes_by_keyword
+    run on the full-text indexes. If writing a change through fails,
+    the next update_data writes the whole book.
+    """
+    def __init__(self, path) -> None:
+        self.__connection = Path(path)
+        self.source = "file:sqlite"
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
+        self._book = None
+        self._write_failed = False
+
+    @property
+    def source_description(self) -> dict:
+        return {"connection": self.__connection,
+                "source": self.source}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.__connection,
+                                       check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    def close(self) -> None:
+        with self._lock:
+            self._detach()
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def read_data(self) -> Any:
+        if not self.__connection.exists():
+            return None
+        with self._lock:
+            try:
+                db = self._connect()
+                kind = db.execute("SELECT value FROM meta "
+                                  "WHERE key = 'book'").fetchone()
+                if kind is None:
+                    return None
+                if kind[0] == "AddressBook":
+                    book = AddressBook.detached()
+                    for (dump,) in db.execute("SELECT record FROM contacts "
+                                              "ORDER BY id"):
+                        book.restore_record(Record.model_validate_json(dump))
+                else:
+                    book = Notebook.detached()
+                    for row in db.execute("SELECT id, content, tags "
+                                          "FROM notes ORDER BY id"):
+                        book.add_record(
+                            Note.from_dict({"note_id": row[0],
+                                            "content": row[1],
+                                            "tags": json.loads(row[2])}))
+            except Exception as err:
+                return err
+            self._attach(book)
+        return book
+
+    def write_data(self, data: Any) -> bool:
+        """Replaces database content with the book."""
+        with self._lock:
+            try:
+                db = self._connect()
+                with db:
+                    if isinstance(data, AddressBook):
+                        rows = [self._contact_row(record)
+                                for record in list(data.data.values())]
+                        db.execute("DELETE FROM contacts")
+                        db.executemany(
+                            "INSERT INTO contacts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            rows)
+                        kind = "AddressBook"
+                    else:
+                        rows = [self._note_row(note)
+                                for note in list(data.data.values())]
+                        db.execute("DELETE FROM notes")
+                        db.executemany("INSERT INTO notes VALUES (?, ?, ?)",
+                                       rows)
+                        kind = "Notebook"
+                    db.execute("INSERT OR REPLACE INTO meta "
+                               "VALUES ('book', ?)", (kind,))
+            except Exception as err:
+                raise DataProviderError(
+                    f"Can't write {self.__connection}: {err}") from err
+            self._write_failed = False
+            self.bytes_written += sum(map(self._row_size, rows))
+            if self._book is not data:
+                self._attach(data)
+        return True
+
+    def update_data(self, data) -> bool:
+        """Attached book is already saved, the others are written."""
+        if self._book is data and not self._write_failed:
+            return True
+        return self.write_data(data)
+
+    def _attach(self, book) -> None:
+        self._detach()
+        self._book = book
+        book.subscribe(self._on_change)
+        book.search_backend = self
+
+    def _detach(self) -> None:
+        if self._book is not None:
+            self._book.unsubscribe(self._on_change)
+            self._book.search_backend = None
+            self._book = None
+
+    @staticmethod
+    def _contact_row(record: Record) -> tuple:
+        fields = record.search_fields
+        return (record.id,
+                *(" | ".join(fields.get(field, ()))
+                  for field in FTS_COLUMNS),
+                record.model_dump_json())
+
+    @staticmethod
+    def _note_row(note: Note) -> tuple:
+        return (note.note_id, note.content, json.dumps(sorted(note.tags)))
+
+    @staticmethod
+    def _row_size(row: tuple) -> int:
+        """Bytes of the row values, pages and indexes SQLite writes
+        along with them are not seen from here."""
+        return sum(len(value.encode("utf-8")) if isinstance(value, str)
+                   else 8 for value in row)
+
+    def _on_change(self, action: str, record) -> None:
+        """Writes a single change of the attached book through."""
+        if isinstance(record, Record):
+            table, row_id = "contacts", record.id
+            row = self._contact_row(record)
+        else:
+            table, row_id = "notes", record.note_id
+            row = self._note_row(record)
+        with self._lock:
+            try:
+                with self._connect() as db:
+                    # delete and insert, so the FTS triggers see the old values
+                    db.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+                    if action != "delete":
+                        db.execute(f"INSERT INTO {table} VALUES "
+                                   f"({', '.join('?' * len(row))})", row)
+                if action != "delete":
+                    self.bytes_written += self._row_size(row)
+            except sqlite3.Error as err:
+                # the book is changed already, it is saved whole next time
+                logger.error("Can't write %s %s to %s: %s",
+                             action, row_id, self.__connection, err)
+                self._write_failed = True
+
+    def _ids(self, query: str, params: Iterable) -> List[int]:
+        with self._lock:
+            return [row_id for (row_id,)
+                    in self._connect().execute(query, tuple(params))]
+
+    def find_record_ids(self, plan: SearchPlan) -> Optional[List[int]]:
+        """IDs of contacts possibly matching the plan, None if the query
+        can't run on the index (trigrams need 3+ characters)."""
+        terms = []
+        for condition in plan.conditions:
+            column = FTS_COLUMNS.get(condition.field)
+            if column is None or len(condition.value) < 3:
+                return None
+            terms.append(f"{column} : {_fts_string(condition.value)}")
+        joiner = " AND " if plan.match_all else " OR "
+        return self._ids("SELECT rowid FROM contacts_fts "
+                         "WHERE contacts_fts MATCH ? ORDER BY rowid",
+                         (joiner.join(terms),))
+
+    def find_note_ids(self,
+                      keywords: List[str],
+                      mode: str) -> Optional[List[int]]:
+        """IDs of notes matching keywords the way
+        Notebook.find_notes_by_keyword does."""
+        words = [word for word in keywords if word]
+        if not words:
+            return []
+        match mode:
+            case "word":
+                query = " OR ".join(map(_fts_string, words))
+            case "prefix":
+                query = " OR ".join(_fts_string(word) + "*" for word in words)
+            case "phrase":
+                query = _fts_string(" ".join(words))
+            case _:
+                return None
+        return self._ids("SELECT rowid FROM notes_fts "
+                         "WHERE notes_fts MATCH ? ORDER BY rowid", (query,))
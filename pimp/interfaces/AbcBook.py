@@ -1,6 +1,7 @@
 """Abstract base class for book storage"""
 from abc import ABC, ABCMeta, abstractmethod
 from collections import UserDict
+from typing import Any, Callable, List, NamedTuple
 
 
 class Singleton(ABCMeta, type):
@@ -15,15 +16,49 @@ class Singleton(ABCMeta, type):
         return cls._instances[cls]
 
 
+class BookDiff(NamedTuple):
+    """IDs of records added, changed and removed by Book.sync_with."""
+    added: List[int]
+    changed: List[int]
+    removed: List[int]
+
+
 class Book(ABC, metaclass=Singleton):
     """Abstract base class for book storage."""
+    # defaults, every book keeps its own counters
     record_counter: int = 0
     record_id: int = 0
+    # number of changes since the book was created or loaded
+    changes: int = 0
+    # data provider able to run searches on its own index, if any
+    search_backend = None
+
+    @classmethod
+    def detached(cls, *args, **kwargs):
+        """Create a book apart from the singleton instance,
+        e.g. for data providers loading a book."""
+        return type.__call__(cls, *args, **kwargs)
 
     @property
     def records_quantity(self):
         return self.record_counter
 
+    def subscribe(self, callback: Callable[[str, Any], None]) -> None:
+        """Call callback(action, record) after every change of the book.
+        Action is one of "add", "edit", "delete"."""
+        if "_subscribers" not in self.__dict__:
+            self._subscribers = []
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[str, Any], None]) -> None:
+        if callback in self.__dict__.get("_subscribers", ()):
+            self._subscribers.remove(callback)
+
+    def _notify(self, action: str, record) -> None:
+        self.changes += 1
+        for callback in self.__dict__.get("_subscribers", ()):
+            callback(action, record)
+
     @abstractmethod
     def add_record(self, record):
         """Create."""
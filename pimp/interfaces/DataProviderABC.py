@@ -3,6 +3,9 @@ from typing import Any
 
 
 class DataProvider(ABC):
+    # bytes written to the storage since the provider was created
+    bytes_written: int = 0
+
     @property
     @abstractmethod
     def source_description(self) -> dict:
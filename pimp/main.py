@@ -4,7 +4,6 @@ Personal_assistant is a personal information manager for everyday tasks:
     remaindering of upcoming birthdays;
     keeping personal notes
 """
-import pickle
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.widgets import (Header,
@@ -50,6 +49,8 @@ class PersonalAssistant(App):
         self.address_book = None
         self.note_book = None
         self.config = PimpEnvironment()
+        # the last quit failed to save the books
+        self.quit_unsaved = False
 
     def compose(self) -> ComposeResult:
         """Create children for the application"""
@@ -72,6 +73,46 @@ class PersonalAssistant(App):
             with TabPane("About", id="about"):
                 yield settings.paSettings
 
+    def on_mount(self) -> None:
+        self.run_worker(self.wait_for_books, thread=True)
+        if self.config.refresh_interval > 0:
+            self.set_interval(self.config.refresh_interval,
+                              self.check_for_changes)
+
+    def wait_for_books(self) -> None:
+        """Books are loaded in background, widgets show them when ready"""
+        self.config.wait_loaded()
+        self.call_from_thread(self.show_books)
+
+    def show_books(self) -> None:
+        self.query_one(dashboard.DashBoard).show_books()
+        self.query_one(contacts.Contacts).show_records()
+        self.query_one(notes.Notes).show_notes()
+
+    def check_for_changes(self) -> None:
+        self.run_worker(self.read_changes, thread=True,
+                        group="refresh", exclusive=True)
+
+    def read_changes(self) -> None:
+        """Data files are re-read in background, if changed outside"""
+        changes = self.config.read_changes()
+        if changes:
+            self.call_from_thread(self.show_changes, changes)
+
+    def show_changes(self, changes) -> None:
+        diffs = self.config.apply_changes(changes)
+        if "AddressBook" in diffs:
+            self.query_one(contacts.Contacts).show_changes(
+                diffs["AddressBook"])
+        if "Notebook" in diffs:
+            self.query_one(notes.Notes).show_changes(diffs["Notebook"])
+        if diffs:
+            self.query_one(dashboard.DashBoard).show_books()
+        for name, conflicts in self.config.conflicts.items():
+            self.notify(f"{name}: {len(conflicts)} records changed outside "
+                        f"the app are kept as changed here",
+                        severity="warning", timeout=10)
+
     def action_show_tab(self, tab_id: str) -> None:
         """
         Switching tabs by id
@@ -81,12 +122,19 @@ class PersonalAssistant(App):
         self.get_child_by_type(TabbedContent).active = tab_id
 
     def action_quit(self) -> None:
-        """Performs quit action"""
-        with open("data/addressbook.bin", "wb") as ab_file:
-            pickle.dump(self.address_book, ab_file)
-        with open("data/notebook.bin", "wb") as nb_file:
-            pickle.dump(self.note_book, nb_file)
-        self.exit()
+        """Performs quit action, the app stays open if books are not saved,
+        quitting once again exits anyway"""
+        if self.config.save_data() or self.quit_unsaved:
+            self.exit()
+            return
+        errors = "\n".join(f"{name}: {stats.error}" for name, stats
+                           in self.config.autosaver.stats.items()
+                           if stats.error is not None)
+        self.notify(f"Books are not saved!\n{errors}\n"
+                    "Quit again to exit without saving.",
+                    severity="error",
+                    timeout=15)
+        self.quit_unsaved = True
 
 
 if __name__ == "__main__":
@@ -0,0 +1,9 @@
+"""Exceptions of the personal assistant"""
+
+
+class DataProviderError(Exception):
+    """Book can't be read or written by a data provider."""
+
+
+class ChecksumError(DataProviderError):
+    """Stored data doesn't match the checksum of its header."""
@@ -1,7 +1,40 @@
+import errno
+import json
 import os
 import shutil
+import threading
 import zipfile
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+CATEGORIES = ['images', 'video', 'documents', 'audio', 'archives', 'unknown']
+# files moved at once, moves mostly wait for the disk or the network
+MOVE_WORKERS = 8
+# progress of an unfinished sort, kept in the sorted folder
+JOURNAL_NAME = '.sort_journal'
+JOURNAL_VERSION = 1
+# journal records between flushes to the disk
+JOURNAL_SYNC_EVERY = 1000
+# files and folders as the last sort left them
+INDEX_NAME = '.sort_index'
+INDEX_VERSION = 1
+RESULTS_NAME = 'results.txt'
+# files of the sorter itself in the sorted folder, they are not sorted,
+# a crash may leave the temporary ones behind
+SORTER_FILES = (JOURNAL_NAME, INDEX_NAME, RESULTS_NAME,
+                JOURNAL_NAME + '.tmp', INDEX_NAME + '.tmp')
+
+TRANSLIT_MAPPING = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'є': 'ie',
+    'ж': 'zh', 'з': 'z', 'и': 'i', 'і': 'i', 'ї': 'i', 'й': 'i', 'к': 'k',
+    'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's',
+    'т': 't', 'у': 'u', 'ф': 'f', 'х': 'kh', 'ц': 'ts', 'ч': 'ch',
+    'ш': 'sh', 'щ': 'shch', 'ь': '', 'ю': 'iu', 'я': 'ia'
+}
+# both cases of the transliterated characters, capitals stay capital
+_CHAR_MAPPING = {**TRANSLIT_MAPPING,
+                 **{char.upper(): translit.capitalize()
+                    for char, translit in TRANSLIT_MAPPING.items()}}
 
 
 def normalize(input_str: str, is_unknown: bool = False) -> str:
@@ -14,30 +47,15 @@ def normalize(input_str: str, is_unknown: bool = False) -> str:
         be treated as an unknown file
     :return: Normalized string
     """
-    translit_mapping = {
-        'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'є': 'ie',
-        'ж': 'zh', 'з': 'z', 'и': 'i', 'і': 'i', 'ї': 'i', 'й': 'i', 'к': 'k',
-        'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's',
-        'т': 't', 'у': 'u', 'ф': 'f', 'х': 'kh', 'ц': 'ts', 'ч': 'ch',
-        'ш': 'sh', 'щ': 'shch', 'ь': '', 'ю': 'iu', 'я': 'ia'
-    }
-
     name, extension = os.path.splitext(input_str)
-    normalized_name = ''
 
     if len(name) == 1 and name.isalpha():
-        return translit_mapping.get(name.lower(), name)
-
-    for orig_char in name:
-        if orig_char.lower() in translit_mapping:
-            translit_char = translit_mapping[orig_char.lower()]
-            if orig_char.isupper():
-                translit_char = translit_char.capitalize()
-            normalized_name += translit_char
-        elif orig_char.isalnum():
-            normalized_name += orig_char
-        else:
-            normalized_name += '_'
+        return TRANSLIT_MAPPING.get(name.lower(), name)
+
+    normalized_name = ''.join(
+        [_CHAR_MAPPING[orig_char] if orig_char in _CHAR_MAPPING
+         else orig_char if orig_char.isalnum() else '_'
+         for orig_char in name])
 
     if is_unknown:
         result = f"{normalized_name}{extension.lower()}"
@@ -71,13 +89,15 @@ def categorize_file(file_path: str) -> str:
         return 'unknown'
 
 
-def extract_archive(archive_path: str, extract_to: str) -> None:
+def extract_archive(archive_path: str, extract_to: str) -> List[str]:
     """
     Extract an archive and transliterate the names of the files in it.
 
     :param archive_path: Path to the archive
     :param extract_to: Folder for extraction
+    :return: Paths of the extracted files
     """
+    extracted = []
     if zipfile.is_zipfile(archive_path):
         archive_folder_name = os.path.splitext(
             os.path.basename(archive_path))[0]
@@ -101,57 +121,591 @@ def extract_archive(archive_path: str, extract_to: str) -> None:
                             file_info.filename),
                         extracted_file_path)
                     print(f"Extracted file: {extracted_file_path}")
+                    if not file_info.is_dir():
+                        extracted.append(extracted_file_path)
+    return extracted
+
+
+class FileEntry(NamedTuple):
+    """A file found by the scan."""
+    path: str
+    name: str
+    category: str
+    size: int
 
 
-def remove_old_archives(folder: str) -> None:
+def category_folder(folder: str, path: str) -> Optional[str]:
     """
-    Remove old archives from a folder.
+    Category of the category folder a path is in or is.
 
-    :param folder: Path to the folder
+    :param folder: Path to the folder with categories
+    :param path: Path to check
+    :return: Category, None if the path is out of category folders
     """
-    for root, dirs, files in os.walk(folder):
-        for file in files:
-            file_path = os.path.join(root, file)
-            if categorize_file(file_path) == 'archives':
-                os.remove(file_path)
+    prefix = os.path.join(folder, '')
+    if path.startswith(prefix):
+        category = path[len(prefix):].partition(os.sep)[0]
+        if category in CATEGORIES:
+            return category
+    return None
 
 
-def process_folder(folder_path: str, destination_folder: str,
-                   empty_folders: List[str]) -> None:
+class SortIndex:
+    """
+    Sorted files and folders as the last sort left them, kept in a file
+        under the sorted folder.
+
+    Files are kept with their size, modification time and category,
+    folders with their modification time. A folder with the same
+    modification time has the same entries, so the next sort takes them
+    from the index instead of listing the folder. A file in a folder
+    that is listed is sorted again only if its size or modification
+    time changed. Only category folders are indexed: anything left
+    elsewhere, e.g. by a failed move, is looked at every time.
     """
-    Process the contents of a folder, move files,
-        and recursively call itself for subfolders.
 
-    :param folder_path: Path to the folder
-    :param destination_folder: Folder for moving files
-    :param empty_folders: List of empty folders
+    def __init__(self, folder_path: str) -> None:
+        self.folder_path = folder_path
+        self.path = os.path.join(folder_path, INDEX_NAME)
+        # path -> (size, modification time in ns, category)
+        self.files: Dict[str, Tuple[int, int, str]] = {}
+        # path -> modification time in ns
+        self.folders: Dict[str, int] = {}
+        self._contents: Optional[Dict[str, Tuple[List[str],
+                                                  List[str]]]] = None
+
+    @classmethod
+    def load(cls, folder_path: str) -> "SortIndex":
+        """
+        Read the index of a folder.
+
+        :param folder_path: Path to the sorted folder
+        :return: Index of the folder, empty if it was never sorted
+        """
+        index = cls(folder_path)
+        try:
+            with open(index.path, 'r', encoding='utf-8') as fin:
+                data = json.load(fin)
+        except FileNotFoundError:
+            return index
+        except (OSError, ValueError) as e:
+            print(f"Ignoring broken sort index {index.path}: {e}")
+            return index
+        if data.get('version') == INDEX_VERSION:
+            # paths are kept relative, the folder may be mounted elsewhere
+            prefix = os.path.join(folder_path, '')
+            index.files = {prefix + path: tuple(state)
+                           for path, state in data['files'].items()}
+            index.folders = {prefix + path: mtime_ns
+                             for path, mtime_ns in data['folders'].items()}
+        return index
+
+    def save(self) -> None:
+        """Write the index, atomically."""
+        start = len(os.path.join(self.folder_path, ''))
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fout:
+            fout.write(json.dumps({
+                'version': INDEX_VERSION,
+                'files': {path[start:]: state
+                          for path, state in self.files.items()},
+                'folders': {path[start:]: mtime_ns
+                            for path, mtime_ns in self.folders.items()}}))
+            fout.flush()
+            os.fsync(fout.fileno())
+        os.replace(tmp_path, self.path)
+
+    def contents(self, folder: str) -> Tuple[List[str], List[str]]:
+        """
+        Files and subfolders of a folder in the index.
+
+        :param folder: Path to the folder
+        :return: Paths of the files and of the subfolders
+        """
+        if self._contents is None:
+            self._contents = {}
+            for path in self.files:
+                self._contents.setdefault(
+                    os.path.dirname(path), ([], []))[0].append(path)
+            for path in self.folders:
+                self._contents.setdefault(
+                    os.path.dirname(path), ([], []))[1].append(path)
+        return self._contents.get(folder, ([], []))
+
+    def update(self, manifest: "Manifest") -> None:
+        """
+        Take the sorted files and folders of a finished sort.
+
+        Only the files and folders the sort changed are looked at.
+
+        :param manifest: Manifest of the sorted folder
+        """
+        files = {}
+        for path, category in manifest.placed.items():
+            if path in manifest.unchanged:
+                files[path] = self.files[path]
+                continue
+            if category_folder(self.folder_path,
+                               os.path.dirname(path)) is None:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files[path] = (stat.st_size, stat.st_mtime_ns, category)
+        folders = dict(manifest.unchanged_folders)
+        for folder in manifest.folders + [os.path.dirname(path)
+                                          for path in manifest.removed]:
+            if category_folder(self.folder_path, folder) is None:
+                continue
+            try:
+                folders[folder] = os.stat(folder).st_mtime_ns
+            except OSError:
+                folders.pop(folder, None)
+        self.files = files
+        self.folders = folders
+        self._contents = None
+
+
+class Manifest:
     """
-    print(f"Processing folder: {folder_path}")
+    Files and folders of a tree collected in a single os.scandir pass.
 
-    items = os.listdir(folder_path)
+    The scan reuses the file type cached in each DirEntry, only the size
+    of a file costs a stat. Later steps of sorting read the manifest
+    instead of walking the tree again. Folders and files the index has
+    as unchanged are not scanned again.
+    """
 
-    for item in items:
-        item_path = os.path.join(folder_path, item)
+    def __init__(self, root: str,
+                 index: Optional[SortIndex] = None) -> None:
+        self.root = root
+        self.index = index if index is not None else SortIndex(root)
+        # files to sort
+        self.files: List[FileEntry] = []
+        # folders listed by the scan
+        self.folders: List[str] = []
+        # folders of extracted archives, made after the scan
+        self.created: Set[str] = set()
+        # where the files are after sorting: path -> category
+        self.placed: Dict[str, str] = {}
+        # sorted files and folders unchanged since the last sort
+        self.unchanged: Set[str] = set()
+        self.unchanged_folders: Dict[str, int] = {}
+        # folders removed as empty
+        self.removed: List[str] = []
+
+    @classmethod
+    def scan(cls, root: str,
+             index: Optional[SortIndex] = None) -> "Manifest":
+        """
+        Scan a folder with all of its subfolders.
+
+        :param root: Path to the folder
+        :param index: Index of the last sort of the folder
+        :return: Manifest of the folder
+        """
+        manifest = cls(root, index)
+        index = manifest.index
+        # files come in the order of a recursive listing: subfolders are
+        # entered where they are met, later moves win name clashes
+        pending = [iter(cls._entries(root))]
+        while pending:
+            entry = next(pending[-1], None)
+            if entry is None:
+                pending.pop()
+            elif isinstance(entry, str):
+                # subfolder of an unchanged folder
+                try:
+                    mtime_ns = os.stat(entry).st_mtime_ns
+                except OSError:
+                    continue
+                pending.append(manifest._enter(entry, mtime_ns))
+            elif os.path.dirname(entry.path) == root and \
+                    entry.name in SORTER_FILES:
+                continue
+            elif entry.is_file():
+                try:
+                    stat = entry.stat()
+                    size = stat.st_size
+                except OSError:
+                    stat, size = None, 0
+                state = index.files.get(entry.path)
+                if stat is not None and state is not None and \
+                        state[:2] == (size, stat.st_mtime_ns):
+                    manifest.unchanged.add(entry.path)
+                    manifest.placed[entry.path] = state[2]
+                else:
+                    manifest.files.append(FileEntry(
+                        entry.path, entry.name, categorize_file(entry.name),
+                        size))
+            elif entry.is_dir(follow_symlinks=False):
+                mtime_ns = None
+                if entry.path in index.folders:
+                    try:
+                        mtime_ns = entry.stat(
+                            follow_symlinks=False).st_mtime_ns
+                    except OSError:
+                        pass
+                pending.append(manifest._enter(entry.path, mtime_ns))
+        return manifest
+
+    def _enter(self, folder: str, mtime_ns: Optional[int]) -> Iterator:
+        """Entries of a folder to scan, those of the index if unchanged."""
+        if mtime_ns is None or self.index.folders.get(folder) != mtime_ns:
+            self.folders.append(folder)
+            return iter(self._entries(folder))
+        self.unchanged_folders[folder] = mtime_ns
+        files, folders = self.index.contents(folder)
+        for path in files:
+            self.unchanged.add(path)
+            self.placed[path] = self.index.files[path][2]
+        return iter(folders)
+
+    @staticmethod
+    def _entries(folder: str) -> List[os.DirEntry]:
+        print(f"Processing folder: {folder}")
+        try:
+            with os.scandir(folder) as entries:
+                return list(entries)
+        except PermissionError as e:
+            print(f"Ignoring Permission error: {e}")
+        except OSError as e:
+            print(f"An error occurred: {e}")
+        return []
+
+
+class PlannedOperation(NamedTuple):
+    """A change sorting makes on disk."""
+    action: str  # 'move', 'extract' or 'delete'
+    source: str
+    category: str
+    target: Optional[str]
+    size: int
+
+
+class PlanSummary(NamedTuple):
+    """Statistics of a sort plan."""
+    files: int
+    size: int
+    moves: int
+    extractions: int
+    deletions: int
+    # moves to a target a later move replaces
+    clashes: int
+    # category -> (files, size)
+    categories: Dict[str, Tuple[int, int]]
+    # sorted files unchanged since the last sort
+    unchanged: int
+
+
+class SortPlan:
+    """
+    Operations sorting of a folder consists of, made from its manifest
+        without changing anything on disk.
 
-        if os.path.isfile(item_path):
-            destination = categorize_file(item_path)
-            normalized_name = normalize(
-                os.path.basename(item_path),
-                destination == 'unknown')
+    Operations follow the scan order, a later move to the same target
+    replaces the earlier one.
+    """
 
-            if destination == 'archives':
-                extract_archive(item_path, destination_folder)
+    def __init__(self, manifest: Manifest, destination_folder: str) -> None:
+        self.manifest = manifest
+        self.destination_folder = destination_folder
+        self.operations: List[PlannedOperation] = []
+        archive_folder = os.path.join(destination_folder, 'archives')
+        for entry in manifest.files:
+            if entry.category == 'archives':
+                if zipfile.is_zipfile(entry.path):
+                    self.operations.append(PlannedOperation(
+                        'extract', entry.path, entry.category,
+                        os.path.join(archive_folder,
+                                     os.path.splitext(entry.name)[0]),
+                        entry.size))
+                self.operations.append(PlannedOperation(
+                    'delete', entry.path, entry.category, None, entry.size))
             else:
-                new_file_path = os.path.join(
-                    destination_folder, destination, normalized_name)
-                os.makedirs(os.path.dirname(new_file_path), exist_ok=True)
-                shutil.move(item_path, new_file_path)
+                normalized_name = normalize(
+                    entry.name, entry.category == 'unknown')
+                self.operations.append(PlannedOperation(
+                    'move', entry.path, entry.category,
+                    os.path.join(destination_folder, entry.category,
+                                 normalized_name),
+                    entry.size))
+
+    def summary(self) -> PlanSummary:
+        """
+        Count the operations of the plan.
+
+        :return: Summary of the plan
+        """
+        counts = {'move': 0, 'extract': 0, 'delete': 0}
+        categories = {category: (0, 0) for category in CATEGORIES}
+        targets = set()
+        for operation in self.operations:
+            counts[operation.action] += 1
+            if operation.action == 'move':
+                targets.add(operation.target)
+            if operation.action != 'delete':
+                files, size = categories[operation.category]
+                categories[operation.category] = (files + 1,
+                                                  size + operation.size)
+        return PlanSummary(
+            len(self.manifest.files),
+            sum(entry.size for entry in self.manifest.files),
+            counts['move'], counts['extract'], counts['delete'],
+            counts['move'] - len(targets), categories,
+            len(self.manifest.unchanged))
+
+
+def plan_folder(folder_path: str) -> SortPlan:
+    """
+    Plan sorting of a folder without changing anything on disk.
+
+    Files unchanged since the last sort of the folder are left out.
+
+    :param folder_path: Path to the folder to be sorted
+    :return: Plan of the sorting
+    """
+    folder_path = os.fspath(folder_path)
+    return SortPlan(Manifest.scan(folder_path, SortIndex.load(folder_path)),
+                    folder_path)
+
+
+class SortJournal:
+    """
+    Progress of sorting a folder, kept in a file under the folder.
+
+    The journal starts with the plan. Every completed operation appends
+    a record of where its files are now. Sorting an interrupted
+    folder again resumes its journal: the plan is read back instead of
+    scanning the folder, and completed operations are skipped.
+    The journal is removed once sorting is done.
+    """
+
+    def __init__(self, plan: SortPlan, path: str) -> None:
+        self.plan = plan
+        self.path = path
+        # operation index -> (path, category) of its files
+        self.done: Dict[int, List[Tuple[str, str]]] = {}
+        self._file = None
+        self._unsynced = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def start(cls, plan: SortPlan) -> "SortJournal":
+        """
+        Write a new journal for a plan.
+
+        :param plan: Plan of the sorting
+        :return: Journal ready for records
+        """
+        journal = cls(plan, os.path.join(plan.destination_folder,
+                                         JOURNAL_NAME))
+        tmp_path = journal.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fout:
+            manifest = plan.manifest
+            fout.write(json.dumps({
+                'version': JOURNAL_VERSION,
+                'folder': plan.destination_folder,
+                'folders': manifest.folders,
+                'unchanged_folders': manifest.unchanged_folders,
+                # sorted files gone or changed since the last sort
+                'dropped': [path for path in manifest.index.files
+                            if path not in manifest.unchanged]}) + '\n')
+            for operation in plan.operations:
+                fout.write(json.dumps(list(operation)) + '\n')
+            fout.flush()
+            os.fsync(fout.fileno())
+        # the plan is in the journal as a whole or not at all
+        os.replace(tmp_path, journal.path)
+        journal._file = open(journal.path, 'a', encoding='utf-8')
+        return journal
+
+    @classmethod
+    def resume(cls, folder_path: str,
+               index: SortIndex) -> Optional["SortJournal"]:
+        """
+        Read the journal of an interrupted sort of a folder.
+
+        :param folder_path: Path to the sorted folder
+        :param index: Index of the folder the sort started with
+        :return: Journal with its plan, None if there is no journal
+        """
+        path = os.path.join(folder_path, JOURNAL_NAME)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as fin:
+            header = json.loads(fin.readline())
+            if header.get('version') != JOURNAL_VERSION:
+                print(f"Ignoring journal of unknown version: {path}")
+                return None
+            manifest = Manifest(folder_path, index)
+            manifest.folders = header['folders']
+            manifest.unchanged_folders = header['unchanged_folders']
+            dropped = set(header['dropped'])
+            for file_path, state in index.files.items():
+                if file_path not in dropped:
+                    manifest.unchanged.add(file_path)
+                    manifest.placed[file_path] = state[2]
+            plan = SortPlan(manifest, folder_path)
+            journal = cls(plan, path)
+            for line in fin:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # the last record, cut by the interruption
+                    break
+                if isinstance(record, list):
+                    plan.operations.append(PlannedOperation(*record))
+                else:
+                    journal.done[record['done']] = [
+                        tuple(placed) for placed in record['placed']]
+        for operation in plan.operations:
+            if operation.action != 'extract':
+                manifest.files.append(FileEntry(
+                    operation.source, os.path.basename(operation.source),
+                    operation.category, operation.size))
+        journal._file = open(path, 'a', encoding='utf-8')
+        print(f"Resuming sorting of {folder_path}: "
+              f"{len(journal.done)} of {len(plan.operations)} "
+              f"operations are done")
+        return journal
+
+    def record(self, index: int, placed: List[Tuple[str, str]]) -> None:
+        """
+        Record a completed operation.
+
+        :param index: Index of the operation in the plan
+        :param placed: Paths and categories of its files
+        """
+        with self._lock:
+            self.done[index] = placed
+            self._file.write(json.dumps({'done': index,
+                                         'placed': placed}) + '\n')
+            # in the OS after the flush, it survives the process
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= JOURNAL_SYNC_EVERY:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+
+    def finish(self) -> None:
+        """Remove the journal of a completed sort."""
+        with self._lock:
+            self._file.close()
+            os.remove(self.path)
+
+
+def move_files(operations: List[Tuple[int, PlannedOperation]],
+               new_file_path: str,
+               journal: Optional[SortJournal] = None) -> List[str]:
+    """
+    Move files to the same place one after another, as the last one
+        of them is the one to stay there.
+
+    :param operations: Moves of the files with their indexes in the plan
+    :param new_file_path: Path to move the files to
+    :param journal: Journal to record the moves in
+    :return: Paths of the files after moving
+    """
+    placed = []
+    for index, operation in operations:
+        try:
+            try:
+                shutil.move(operation.source, new_file_path)
+            except FileNotFoundError:
+                # moved before an interruption, but not recorded
+                if os.path.lexists(operation.source) or \
+                        not os.path.exists(new_file_path):
+                    raise
+            placed.append(new_file_path)
+            if journal is not None:
+                journal.record(index, [(new_file_path, operation.category)])
+        except PermissionError as e:
+            print(f"Ignoring Permission error: {e}")
+            placed.append(operation.source)
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            placed.append(operation.source)
+    return placed
+
 
-        elif os.path.isdir(item_path):
-            process_folder(item_path, destination_folder, empty_folders)
+def process_folder(plan: SortPlan, workers: int = MOVE_WORKERS,
+                   journal: Optional[SortJournal] = None) -> None:
+    """
+    Carry out the moves and extractions of a plan.
 
-    if not os.listdir(folder_path):
-        empty_folders.append(folder_path)
+    Files are moved by a pool of workers, category folders are made
+    once before that. Archives are extracted after the moves.
+    Operations the journal has as done are skipped.
+
+    :param plan: Plan of the sorting
+    :param workers: Number of files moved at once
+    :param journal: Journal to record the progress in
+    """
+    manifest = plan.manifest
+    done = journal.done if journal is not None else {}
+    moves: Dict[str, List[Tuple[int, PlannedOperation]]] = {}
+    for index, operation in enumerate(plan.operations):
+        if index in done:
+            for file_path, category in done[index]:
+                manifest.placed[file_path] = category
+                manifest.unchanged.discard(file_path)
+        elif operation.action == 'move':
+            moves.setdefault(operation.target, []).append(
+                (index, operation))
+
+    for category_folder in {os.path.dirname(path) for path in moves}:
+        os.makedirs(category_folder, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max(1, workers),
+                            thread_name_prefix="sorter") as executor:
+        results = executor.map(move_files, moves.values(), moves,
+                               [journal] * len(moves))
+        for operations, placed in zip(moves.values(), results):
+            for (_, operation), file_path in zip(operations, placed):
+                manifest.placed[file_path] = operation.category
+                manifest.unchanged.discard(file_path)
+
+    for index, operation in enumerate(plan.operations):
+        if operation.action == 'delete':
+            # the archive itself is removed by remove_old_archives
+            manifest.placed[operation.source] = operation.category
+        elif operation.action == 'extract':
+            manifest.folders.append(os.path.dirname(operation.target))
+            manifest.created.add(operation.target)
+            if index in done:
+                continue
+            try:
+                extracted = [
+                    (path, categorize_file(path))
+                    for path in extract_archive(operation.source,
+                                                plan.destination_folder)]
+                manifest.placed.update(extracted)
+                manifest.unchanged.difference_update(
+                    path for path, _ in extracted)
+                if journal is not None:
+                    journal.record(index, extracted)
+
+            except PermissionError as e:
+                print(f"Ignoring Permission error: {e}")
+            except Exception as e:
+                print(f"An error occurred: {e}")
+
+
+def remove_old_archives(manifest: Manifest) -> None:
+    """
+    Remove old archives, the extracted ones included.
+
+    :param manifest: Manifest of the sorted folder
+    """
+    for file_path, category in list(manifest.placed.items()):
+        if category == 'archives':
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                # removed before an interruption
+                pass
+            del manifest.placed[file_path]
 
 
 def create_category_folders(root_folder: str, destination_folder: str) -> None:
@@ -161,59 +715,60 @@ def create_category_folders(root_folder: str, destination_folder: str) -> None:
     :param root_folder: Root folder where categories are located
     :param destination_folder: Folder for categories
     """
-    categories = [
-        'images',
-        'video',
-        'documents',
-        'audio',
-        'archives',
-        'unknown']
-    for category in categories:
+    for category in CATEGORIES:
         if category not in ['archives', 'video',
                             'audio', 'documents', 'images']:
             category_path = os.path.join(destination_folder, category)
             os.makedirs(category_path, exist_ok=True)
 
 
-def remove_empty_folders(folder: str) -> None:
+def remove_empty_folders(manifest: Manifest) -> None:
     """
-    Remove empty folders.
+    Remove empty folders, the deepest ones first.
 
-    :param folder: Path to the folder
+    :param manifest: Manifest of the sorted folder
     """
-    for root, dirs, files in os.walk(folder, topdown=False):
-        for dir in dirs:
-            dir_path = os.path.join(root, dir)
-            if not os.listdir(dir_path):
-                try:
-                    os.rmdir(dir_path)
-                    print(f"Removed empty folder: {dir_path}")
-                except OSError as e:
-                    print(f"Failed to remove empty folder {dir_path}: {e}")
+    folders = set(manifest.folders)
+    for folder in manifest.created:
+        # extracted archives are new since the scan and small next to it
+        for root, dirs, files in os.walk(folder):
+            folders.update(os.path.join(root, dir) for dir in dirs)
+        folders.add(folder)
+    manifest.folders = list(folders)
+    for dir_path in sorted(folders, key=lambda path: path.count(os.sep),
+                           reverse=True):
+        try:
+            os.rmdir(dir_path)
+            manifest.removed.append(dir_path)
+            print(f"Removed empty folder: {dir_path}")
+        except OSError as e:
+            if e.errno not in (errno.ENOTEMPTY, errno.EEXIST, errno.ENOENT):
+                print(f"Failed to remove empty folder {dir_path}: {e}")
 
 
-def list_files_by_category(folder: str, output_file: str) -> None:
+def list_files_by_category(manifest: Manifest, folder: str,
+                           output_file: str) -> None:
     """
     Create a list of files by category and write it to a text file.
 
+    :param manifest: Manifest of the sorted folder
     :param folder: Path to the folder with categories
     :param output_file: Path to the output file
     """
-    categories = [
-        'images',
-        'video',
-        'documents',
-        'audio',
-        'archives',
-        'unknown']
+    by_category: Dict[str, List[str]] = {
+        category: [] for category in CATEGORIES}
+    categories: Dict[str, Optional[str]] = {}
+    for file_path in manifest.placed:
+        file_folder = os.path.dirname(file_path)
+        if file_folder not in categories:
+            categories[file_folder] = category_folder(folder, file_folder)
+        if categories[file_folder] is not None:
+            by_category[categories[file_folder]].append(file_path)
     with open(output_file, 'w', encoding='utf-8') as output_file_handle:
-        for category in categories:
+        for category in CATEGORIES:
             output_file_handle.write(f"\nFiles in category {category}:\n")
-            category_path = os.path.join(folder, category)
-            for root, dirs, files in os.walk(category_path):
-                for file_name in files:
-                    file_path = os.path.join(root, file_name)
-                    output_file_handle.write(f"{file_path}\n")
+            for file_path in by_category[category]:
+                output_file_handle.write(f"{file_path}\n")
 
 
 def list_known_extensions(folder: str, output_file: str,
@@ -231,82 +786,56 @@ def list_known_extensions(folder: str, output_file: str,
         output_file_handle.write(known_extensions_str)
 
 
-def list_unknown_extensions(folder: str, output_file: str) -> None:
+def list_unknown_extensions(manifest: Manifest, output_file: str) -> None:
     """
     List unknown extensions and write them to a text file.
 
-    :param folder: Path to the folder with unknown extensions
+    :param manifest: Manifest of the sorted folder
     :param output_file: Path to the output file
     """
     with open(output_file, 'a', encoding='utf-8') as output_file_handle:
         output_file_handle.write("\nUnknown extensions:\n")
         unknown_extensions = set()
-        for root, dirs, files in os.walk(folder):
-            for file_name in files:
-                file_path = os.path.join(root, file_name)
-                if categorize_file(file_path) == 'unknown':
-                    unknown_extensions.add(os.path.splitext(file_name)[-1][1:])
+        for file_path, category in manifest.placed.items():
+            if category == 'unknown':
+                unknown_extensions.add(os.path.splitext(file_path)[-1][1:])
         unknown_extensions_str = ', '.join(sorted(unknown_extensions))
         output_file_handle.write(unknown_extensions_str)
 
 
-def process_folder(folder_path: str, destination_folder: str, empty_folders: List[str]) -> None:
-    """
-    Process the contents of a folder, move files,
-        and recursively call itself for subfolders.
-
-    :param folder_path: Path to the folder
-    :param destination_folder: Folder for moving files
-    :param empty_folders: List of empty folders
-    """
-    print(f"Processing folder: {folder_path}")
-
-    items = os.listdir(folder_path)
-
-    for item in items:
-        item_path = os.path.join(folder_path, item)
-
-        try:
-            if os.path.isfile(item_path):
-                destination = categorize_file(item_path)
-                normalized_name = normalize(
-                    os.path.basename(item_path),
-                    destination == 'unknown')
-
-                if destination == 'archives':
-                    extract_archive(item_path, destination_folder)
-                else:
-                    new_file_path = os.path.join(
-                        destination_folder, destination, normalized_name)
-                    os.makedirs(os.path.dirname(new_file_path), exist_ok=True)
-                    shutil.move(item_path, new_file_path)
-
-            elif os.path.isdir(item_path):
-                process_folder(item_path, destination_folder, empty_folders)
-
-        except PermissionError as e:
-            print(f"Ignoring Permission error: {e}")
-        except Exception as e:
-            print(f"An error occurred: {e}")
-
-    if not os.listdir(folder_path):
-        empty_folders.append(folder_path)
-
-
-def sorted_folder(folder_path: str) -> str:
+def sorted_folder(folder_path: str, workers: int = MOVE_WORKERS,
+                  plan: Optional[SortPlan] = None) -> str:
     """
     Sort and categorize files in the specified folder.
 
+    The folder is scanned once, all the steps after the scan
+    work with its manifest. Progress is journaled, sorting a folder
+    after an interruption continues the interrupted sort. The index
+    of the sorted files lets the next sort skip files it already sorted.
+
     :param folder_path: Path to the folder to be sorted
+    :param workers: Number of files moved at once
+    :param plan: Plan made by plan_folder for the folder, if any
     """
+    folder_path = os.fspath(folder_path)
     destination_folder = folder_path
-    output_file = os.path.join(folder_path, 'results.txt')
-
+    output_file = os.path.join(folder_path, RESULTS_NAME)
+
+    index = plan.manifest.index if plan is not None \
+        else SortIndex.load(folder_path)
+    journal = SortJournal.resume(folder_path, index)
+    if journal is None:
+        if plan is None:
+            plan = SortPlan(Manifest.scan(folder_path, index), folder_path)
+        journal = SortJournal.start(plan)
+    plan = journal.plan
+    manifest = plan.manifest
     create_category_folders(folder_path, destination_folder)
-    empty_folders = []
-    process_folder(folder_path, destination_folder, empty_folders)
-    remove_old_archives(folder_path)
-    list_files_by_category(destination_folder, output_file)
+    manifest.folders += [os.path.join(destination_folder, category)
+                         for category in CATEGORIES]
+    process_folder(plan, workers, journal)
+    remove_old_archives(manifest)
+    list_files_by_category(manifest, destination_folder, output_file)
 
     known_extensions = {
         'JPEG', 'PNG', 'JPG', 'SVG', 'AVI', 'MP4', 'MOV',
@@ -315,8 +844,10 @@ def sorted_folder(folder_path: str) -> str:
     }
 
     list_known_extensions(destination_folder, output_file, known_extensions)
-    list_unknown_extensions(destination_folder, output_file)
-    remove_empty_folders(folder_path)
-    remove_empty_folders(destination_folder)
+    list_unknown_extensions(manifest, output_file)
+    remove_empty_folders(manifest)
+    manifest.index.update(manifest)
+    manifest.index.save()
+    journal.finish()
 
     return output_file
\ No newline at end of file
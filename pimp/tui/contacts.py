@@ -1,13 +1,16 @@
 """Contacts widget."""
 import datetime
-from typing import List
+from itertools import islice
+from typing import Iterator, List
 
 from rich.console import RenderableType
 from rich.text import Text
 from textual.app import ComposeResult
 from textual.containers import Horizontal, Vertical, Grid
+from textual.message import Message
 from textual.widget import Widget
 from textual.widgets import Static, Button, ContentSwitcher, DataTable, Label, Input
+from textual.widgets.data_table import RowKey
 from textual import on
 from cls.AddressBook import Address, Record, AddressBook, Birthday, Phone
 from cls.validators import (
@@ -18,6 +21,10 @@ from cls.validators import (
     ZipCodeValidator,
 )
 from cls.PimpEnvironment import PimpEnvironment
+from interfaces.AbcBook import BookDiff
+
+# contacts added to the list at once, the next ones are added on scrolling
+PAGE_SIZE = 100
 
 
 def _phones_str(phones):
@@ -72,18 +79,32 @@ class ContactDetails(Static):
         return text
 
 
+class ContactsTable(DataTable):
+    """Table of contacts asking for more rows when scrolled to its end"""
+
+    class NearEnd(Message):
+        """Last shown rows are about to be scrolled into view"""
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        if new_value >= self.max_scroll_y - self.size.height:
+            self.post_message(self.NearEnd())
+
+
 class ContatsList(Widget):
     """Widget to display list of contacts"""
+    # found records, the whole address book is shown page by page
     records: List[Record] = []
-    table = DataTable(classes="data_table", id="contacts_list")
+    table = ContactsTable(classes="data_table", id="contacts_list")
+    _pages: Iterator[Record] | None = None
+    _last_id = 0
 
     def contact_adder(self):
         table = self.query_one(DataTable)
         table.clear()
         contacts_list: ContatsList = self.parent.query_one(ContatsList)
         contacts: Contacts = self.app.query_one(Contacts)
-        contacts.records = list(self.app.address_book.data.values())
-        contacts.current_record = contacts.records[0]
+        contacts.current_record = contacts.first_record()
         contacts_list.fill_the_table()
         table.refresh()
 
@@ -95,32 +116,72 @@ class ContatsList(Widget):
         self.table.zebra_stripes = True
         self.table.cell_padding = 2
         self.table.cursor_type = "row"
-        self.table.add_column("#", width=3)
-        self.table.add_column("Name", width=10)
-        self.table.add_column("Birhday", width=10)
-        self.table.add_column("Address", width=20)
-        self.table.add_column("e-mail", width=18)
-        self.table.add_column("Phones", width=20)
+        self.columns = [self.table.add_column("#", width=3),
+                        self.table.add_column("Name", width=10),
+                        self.table.add_column("Birhday", width=10),
+                        self.table.add_column("Address", width=20),
+                        self.table.add_column("e-mail", width=18),
+                        self.table.add_column("Phones", width=20)]
         self.fill_the_table()
 
+    @staticmethod
+    def _row_cells(row: Record) -> tuple:
+        bd = row.birthday.local_str if row.birthday else ""
+        addr = row.address.as_string if row.address else ""
+        return row.name, bd, addr, row.email, str(row.phones)
+
     def fill_the_table(self, records: List[Record] = []):
-        if not records:
-            self.records = self.app.query_one("Contacts").records
-        line_num = 1
-        for row in self.records:
-            bd = row.birthday.local_str if row.birthday else ""
-            addr = row.address.as_string if row.address else ""
+        """Shows found records or the first page of the address book"""
+        self.records = records
+        self._pages = None
+        self._last_id = 0
+        address_book = self.app.address_book
+        if not records and address_book.loaded and not address_book.failed:
+            # the book may change between pages, iterator copes with it
+            self._pages = self.app.address_book.iterator()
+        self._add_rows(records)
+        self.show_more()
+
+    def show_more(self) -> None:
+        """Adds the next page of the address book"""
+        if self._pages is None:
+            return
+        page = list(islice(self._pages, PAGE_SIZE))
+        if len(page) < PAGE_SIZE:
+            self._pages = None
+        self._add_rows(page)
+
+    def _add_rows(self, records: List[Record]) -> None:
+        for row in records:
+            if RowKey(row.id) in self.table.rows:
+                continue
             self.table.add_row(
-                str(line_num),
-                row.name,
-                bd,
-                addr,
-                row.email,
-                str(row.phones),
+                str(self.table.row_count + 1),
+                *self._row_cells(row),
                 height=1,
-                key=row.name,
+                key=row.id,
             )
-            line_num += 1
+            self._last_id = max(self._last_id, row.id)
+
+    def on_contacts_table_near_end(self, _: ContactsTable.NearEnd) -> None:
+        self.show_more()
+
+    def update_rows(self, diff: BookDiff) -> None:
+        """Applies changes of the address book to the shown rows"""
+        address_book: AddressBook = self.app.address_book
+        for record_id in diff.removed:
+            if RowKey(record_id) in self.table.rows:
+                self.table.remove_row(RowKey(record_id))
+        for record_id in diff.changed:
+            if RowKey(record_id) in self.table.rows:
+                cells = self._row_cells(address_book.data[record_id])
+                for column, value in zip(self.columns[1:], cells):
+                    self.table.update_cell(RowKey(record_id), column, value)
+        for record_id in diff.added:
+            if self._pages is not None and record_id > self._last_id:
+                # comes with one of the next pages
+                continue
+            self._add_rows([address_book.data[record_id]])
 
     def compose(self) -> ComposeResult:
         yield self.table
@@ -198,7 +259,8 @@ class ContactsViewControl(Widget):
             self.notify("No search conditions are specified!",
                         severity="warning",
                         timeout=8)
-        records: List[Record] = address_book.find_record(search_conditions)
+        records: List[Record] = address_book.find_record(search_conditions,
+                                                         match_all=True)
         if len(records) == 0:
             self.notify("Search returned no results!",
                         severity="warning",
@@ -220,16 +282,12 @@ class ContactsViewControl(Widget):
 
     def cv_control_delete(self) -> None:
         record: Record = self.app.query_one(Contacts).current_record
-        self.app.address_book.delete_record(record.name)
+        self.app.address_book.delete_record(record)
         table = self.parent.query_one(DataTable)
         table.clear()
         contacts_list: ContatsList = self.parent.query_one(ContatsList)
         contacts: Contacts = self.app.query_one(Contacts)
-        contacts.records = list(self.app.address_book.data.values())
-        if contacts.records:
-            contacts.current_record = contacts.records[0]
-        else:
-            contacts.current_record = Record()
+        contacts.current_record = contacts.first_record() or Record()
         contacts_list.fill_the_table()
         table.refresh()
 
@@ -492,16 +550,14 @@ class Contacts(Static):
     """Container widget for Contacts tab"""
     app_config = PimpEnvironment()
     current_record: Record = None
-    records: List[Record] = []
     edit_flag = False
     record_viewer = ContactsView(id="contacts_viewer")
     record_editor = ContactsAdd(id="contacts_editor")
 
     def compose(self) -> ComposeResult:
         """Composing main elements"""
-        self.records = list(self.app_config.address_book.data.values())
-        if len(self.records) > 0:
-            self.current_record = self.records[0]
+        if self.app_config.address_book.loaded:
+            self.current_record = self.first_record()
         else:
             self.current_record = None
 
@@ -514,6 +570,31 @@ class Contacts(Static):
                               initial="contacts_viewer",
                               id="cs_contacts")
 
+    def first_record(self) -> Record | None:
+        if self.app_config.address_book.failed:
+            return None
+        records = self.app_config.address_book.get_records(0, 1)
+        return records[0] if records else None
+
+    def show_records(self) -> None:
+        """Fills the contacts list when the address book is loaded"""
+        self.current_record = self.first_record()
+        contacts_list: ContatsList = self.query_one(ContatsList)
+        if self.app_config.address_book.failed:
+            contacts_list.border_title = "Contacts list: failed to load"
+        contacts_list.table.clear()
+        contacts_list.fill_the_table()
+        self.query_one(ContactDetails).refresh()
+
+    def show_changes(self, diff: BookDiff) -> None:
+        """Updates shown contacts with changes made outside the app"""
+        address_book: AddressBook = self.app_config.address_book
+        current = self.current_record and address_book.data.get(
+            self.current_record.id)
+        self.current_record = current or self.first_record()
+        self.query_one(ContatsList).update_rows(diff)
+        self.query_one(ContactDetails).refresh()
+
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Switching content by button pressed"""
         if event.button.id.startswith("btn_contacts_"):
@@ -15,6 +15,11 @@ from cls.NoteBook import Notebook
 from cls.PimpEnvironment import PimpEnvironment
 
 
+def _load_time(book_name: str) -> str:
+    seconds = PimpEnvironment().load_timings.get(book_name)
+    return "" if seconds is None else f" ({seconds:.2f} s)"
+
+
 class DateClock(Widget):
     """
     Date Clock widget for Dashboard
@@ -47,15 +52,27 @@ class AddressBookStats(Widget):
         self.address_book = PimpEnvironment().address_book
 
     def compose(self) -> ComposeResult:
-        abook_len = len(self.address_book.data)
-        yield Label("AddressBook is loaded", classes="db_stats_title")
-        yield Label(f"contains {abook_len} items", classes="db_stats_nums")
+        yield Label("AddressBook is loading", classes="db_stats_title")
+        yield Label("", classes="db_stats_nums")
+
+    def on_mount(self) -> None:
+        self.show_stats()
+
+    def show_stats(self) -> None:
+        """Shows size of the book once it is loaded"""
+        if not self.address_book.loaded:
+            return
+        title, nums = self.query(Label)
+        if self.address_book.failed:
+            title.update("AddressBook failed to load")
+            nums.update(str(self.address_book.error))
+            return
+        title.update("AddressBook is loaded")
+        nums.update(f"contains {len(self.address_book.data)} items"
+                    + _load_time("AddressBook"))
 
     def on_show(self) -> None:
-        abook_len = len(self.address_book.data)
-        yield Label("AddressBook is loaded", classes="db_stats_title")
-        yield Label(f"contains {abook_len} items", classes="db_stats_nums")
-        self.refresh()
+        self.show_stats()
 
 
 class NoteBookStats(Widget):
@@ -67,15 +84,27 @@ class NoteBookStats(Widget):
         self.note_book: Notebook = PimpEnvironment().note_book
 
     def compose(self) -> ComposeResult:
-        nbook_len = len(self.note_book.data)
-        yield Label("Notebook is loaded", classes="db_stats_title")
-        yield Label(f"contains {nbook_len} items", classes="db_stats_nums")
+        yield Label("Notebook is loading", classes="db_stats_title")
+        yield Label("", classes="db_stats_nums")
 
-    def on_show(self) -> ComposeResult:
-        nbook_len = len(self.note_book.data)
-        yield Label("Notebook is loaded", classes="db_stats_title")
-        yield Label(f"contains {nbook_len} items", classes="db_stats_nums")
-        self.refresh()
+    def on_mount(self) -> None:
+        self.show_stats()
+
+    def show_stats(self) -> None:
+        """Shows size of the book once it is loaded"""
+        if not self.note_book.loaded:
+            return
+        title, nums = self.query(Label)
+        if self.note_book.failed:
+            title.update("Notebook failed to load")
+            nums.update(str(self.note_book.error))
+            return
+        title.update("Notebook is loaded")
+        nums.update(f"contains {len(self.note_book.data)} items"
+                    + _load_time("Notebook"))
+
+    def on_show(self) -> None:
+        self.show_stats()
 
 
 class TodaysMates(Static):
@@ -91,6 +120,10 @@ class TodaysMates(Static):
         self.styles.border = ("round", "#FFD900")
 
     def render(self) -> RenderableType:
+        if not self.address_book.loaded:
+            return "Loading birthday mates..."
+        if self.address_book.failed:
+            return "AddressBook failed to load"
         self.today_mates = self.address_book.today_mates()
         table = Table(title="Today birthday mates")
         table.box = None
@@ -98,10 +131,9 @@ class TodaysMates(Static):
         table.add_column("Name", justify="left", width=20)
         table.add_column("Age", justify="center", width=6)
         num_line = 1
+        cur_year = datetime.today().year
         for mate in self.today_mates:
-            cur_year = datetime.today().year
-            born_year = int(mate.birthday.local_str[-4:])
-            age = str(cur_year - born_year)
+            age = str(cur_year - mate.birthday.date.year)
             table.add_row(str(num_line), mate.name, age)
             num_line += 1
 
@@ -120,6 +152,10 @@ class UpcomingMates(Widget):
         self.styles.border = ("round", "#FFD900")
 
     def render(self) -> RenderableType:
+        if not self.address_book.loaded:
+            return "Loading birthday mates..."
+        if self.address_book.failed:
+            return "AddressBook failed to load"
         self.upcoming_mates = (self.address_book
                                .upcoming_mates(self.days_to_watch))
         title = f"Birthday mates upcoming in {self.days_to_watch}"
@@ -130,10 +166,9 @@ class UpcomingMates(Widget):
         table.add_column("Birthday", justify="center", width=18)
         table.add_column("Age", justify="center", width=6)
         num_line = 1
+        cur_year = datetime.today().year
         for mate in self.upcoming_mates:
-            cur_year = datetime.today().year
-            born_year = int(mate.birthday.local_str[-4:])
-            age = str(cur_year - born_year)
+            age = str(cur_year - mate.birthday.date.year)
             table.add_row(str(num_line),
                           mate.name,
                           mate.birthday.local_str,
@@ -180,3 +215,10 @@ class DashBoard(Static):
                 up_mates: UpcomingMates = self.query_one(UpcomingMates)
                 up_mates.days_to_watch = int(input.value)
                 up_mates.refresh()
+
+    def show_books(self) -> None:
+        """Updates widgets when the books are loaded"""
+        self.query_one(AddressBookStats).show_stats()
+        self.query_one(NoteBookStats).show_stats()
+        self.query_one(TodaysMates).refresh()
+        self.query_one(UpcomingMates).refresh()
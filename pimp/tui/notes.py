@@ -15,11 +15,12 @@ from textual.widgets import (Label,
                              DataTable,
                              ContentSwitcher,
                              Input, Rule)
+from textual.widgets.data_table import RowKey
 
 from cls.NoteBook import Note, Notebook
-from datetime import datetime
 
 from cls.PimpEnvironment import PimpEnvironment
+from interfaces.AbcBook import BookDiff
 
 
 class NoteInput(Widget):
@@ -53,15 +54,17 @@ class NoteInput(Widget):
                 self.query_one(TextArea).clear()
                 self.query_one("Input#nt_input_tags_field").clear()
             case 'nt_input_save_button':
-                if self.app.query_one(Notes).edit_flag:
-                    note = self.app.query_one(Notes).current_note
-                    self.app.note_book.delete_record(note)
-                    self.app.query_one(Notes).edit_flag = False
                 text = self.query_one(TextArea).text
                 tags = self.query_one("Input#nt_input_tags_field").value.split()
                 note_book: Notebook = self.app.note_book
-                note_book.add_record(Note(content=text,
-                                        tags=tags))
+                if self.app.query_one(Notes).edit_flag:
+                    note = self.app.query_one(Notes).current_note
+                    note_book.edit_record(note, Note(content=text,
+                                                     tags=tags))
+                    self.app.query_one(Notes).edit_flag = False
+                else:
+                    note_book.add_record(Note(content=text,
+                                              tags=tags))
                 notes_list = self.app.query_one(NotesList).refresh()
                 notes_list.note_adder()
                 self.notify("Note`s info added", severity="information", timeout=7)
@@ -100,27 +103,45 @@ class NotesList(Widget):
         self.table.zebra_stripes = True
         self.table.cell_padding = 2
         self.table.cursor_type = "row"
-        self.table.add_column("#", width=3)
-        self.table.add_column("Note created", width=14)
-        self.table.add_column("Brief", width=38)
-        self.table.add_column("Tags", width=40)
+        self.columns = [self.table.add_column("#", width=3),
+                        self.table.add_column("Note created", width=14),
+                        self.table.add_column("Brief", width=38),
+                        self.table.add_column("Tags", width=40)]
         self.fill_the_table()
 
+    @staticmethod
+    def _row_cells(row: Note) -> tuple:
+        created = row.created.strftime("%a %d-%m-%Y %H:%M:%S")
+        return created, (row.content[:35]+"..."), "; ".join(row.tags)
+
     def fill_the_table(self, notes: List[Note] = []):
         if not notes:
             self.notes = self.app.query_one(Notes).notes
         line_num = 1
         for row in self.notes:
-            created = (datetime.fromtimestamp(row.note_id)
-                       .strftime("%a %d-%m-%Y %H:%M:%S"))
             self.table.add_row(str(line_num),
-                               created,
-                               (row.content[:35]+"..."),
-                               "; ".join(row.tags),
+                               *self._row_cells(row),
                                height=1,
                                key=row.note_id)
             line_num += 1
 
+    def update_rows(self, diff: BookDiff) -> None:
+        """Applies changes of the notebook to the shown rows"""
+        note_book: Notebook = self.app.note_book
+        for note_id in diff.removed:
+            if RowKey(note_id) in self.table.rows:
+                self.table.remove_row(RowKey(note_id))
+        for note_id in diff.changed:
+            if RowKey(note_id) in self.table.rows:
+                cells = self._row_cells(note_book.data[note_id])
+                for column, value in zip(self.columns[1:], cells):
+                    self.table.update_cell(RowKey(note_id), column, value)
+        for note_id in diff.added:
+            self.table.add_row(str(self.table.row_count + 1),
+                               *self._row_cells(note_book.data[note_id]),
+                               height=1,
+                               key=note_id)
+
     def compose(self) -> ComposeResult:
         yield self.table
 
@@ -265,9 +286,9 @@ class NoteDetails(Static):
 
     def render(self) -> RenderableType:
         self.get_note_info()
-        note_id = self.current_note.note_id
-        created = (datetime.fromtimestamp(int(note_id))
-                   .strftime("%A %d-%m-%Y %H:%M:%S"))
+        created_at = self.current_note.created
+        created = (created_at.strftime("%A %d-%m-%Y %H:%M:%S")
+                   if created_at else "---")
         content = self.current_note.content or ""
         if len(self.current_note.tags) > 0:
             tags = ", ".join(self.current_note.tags)
@@ -307,7 +328,11 @@ class Notes(Static):
     edit_flag = False
 
     def compose(self):
-        self.notes = list(self.app_config.note_book.data.values())
+        note_book = self.app_config.note_book
+        if note_book.loaded and not note_book.failed:
+            self.notes = list(note_book.data.values())
+        else:
+            self.notes = []
         if len(self.notes) > 0:
             self.current_note = self.notes[0]
         else:
@@ -325,6 +350,30 @@ class Notes(Static):
             yield NotesView(id="notes_view")
             yield CreateNote(id="notes_create")
 
+    def show_notes(self) -> None:
+        """Fills the notes list when the notebook is loaded"""
+        note_book = self.app_config.note_book
+        self.notes = ([] if note_book.failed
+                      else list(note_book.data.values()))
+        self.current_note = self.notes[0] if self.notes else Note()
+        notes_list: NotesList = self.query_one(NotesList)
+        if note_book.failed:
+            notes_list.border_title = "Notes list: failed to load"
+        notes_list.table.clear()
+        notes_list.fill_the_table()
+        self.query_one(NoteDetails).refresh()
+
+    def show_changes(self, diff: BookDiff) -> None:
+        """Updates shown notes with changes made outside the app"""
+        note_book: Notebook = self.app_config.note_book
+        self.notes = list(note_book.data.values())
+        current = note_book.data.get(self.current_note.note_id)
+        if current is None:
+            current = self.notes[0] if self.notes else Note()
+        self.current_note = current
+        self.query_one(NotesList).update_rows(diff)
+        self.query_one(NoteDetails).refresh()
+
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Switchin content by button presseed"""
         if event.button.id.startswith("btn_notes_"):
@@ -2,7 +2,7 @@ from textual.app import ComposeResult
 from textual.containers import Vertical, Horizontal
 from textual.reactive import reactive
 from textual.widgets import Static, DirectoryTree, Button
-from modules.sorted_folder import sorted_folder
+from modules.sorted_folder import sorted_folder, plan_folder, SortPlan
 from textual.widgets._directory_tree import DirEntry
 from textual.widgets._tree import TreeNode
 from pathlib import Path
@@ -32,6 +32,45 @@ class DirTreeSelected(Static):
         return f"Selected: {self.selected}"
 
 
+class SortPlanView(Static):
+    """
+    Widget to display the summary of a sort plan.
+    """
+
+    @staticmethod
+    def format_size(size: int) -> str:
+        """Human readable size."""
+        for unit in ("B", "KB", "MB", "GB"):
+            if size < 1024:
+                return f"{size:.0f} {unit}"
+            size /= 1024
+        return f"{size:.1f} TB"
+
+    def show_plan(self, plan: SortPlan | None) -> None:
+        """
+        Show the summary of the plan, nothing if there is no plan.
+
+        Args:
+            plan (SortPlan | None): The plan to show.
+        """
+        if plan is None:
+            self.update("")
+            return
+        summary = plan.summary()
+        lines = [
+            f"Plan for {plan.destination_folder}: "
+            f"{summary.files} files, {self.format_size(summary.size)}",
+            f"Moves: {summary.moves}, name clashes: {summary.clashes}, "
+            f"archives to extract: {summary.extractions}, "
+            f"to delete: {summary.deletions}",
+            f"Sorted files unchanged since the last sort: "
+            f"{summary.unchanged}"]
+        lines += [f"  {category}: {files} files, {self.format_size(size)}"
+                  for category, (files, size) in summary.categories.items()
+                  if files]
+        self.update("\n".join(lines))
+
+
 class Sorter(Static):
     """
     Widget for file sorting with a DirectoryTree and sorting buttons.
@@ -47,6 +86,7 @@ class Sorter(Static):
 
     buttons = buttons or [Button("/", variant="primary", classes="tree_button",
                                  id="root_drive")]
+    plan: SortPlan | None = None
 
     def compose(self) -> ComposeResult:
         """Compose the widget."""
@@ -61,7 +101,12 @@ class Sorter(Static):
             ),
             self.dir_tree,
             DirTreeSelected(id="dir_selected"),
-            Button("Sort files", variant="default", id="sort_folder")
+            SortPlanView(id="sort_plan"),
+            Horizontal(
+                Button("Preview", variant="default", id="preview_sort"),
+                Button("Sort files", variant="default", id="sort_folder"),
+                id="sort_buttons"
+            )
         )
 
     def is_system_folder(self, folder_path: Path) -> bool:
@@ -110,9 +155,21 @@ class Sorter(Static):
             drive_letter = str(event.button.label).rstrip(":").lower()
             new_path = f"{drive_letter}:{os.sep}" if drive_letter.isalpha() else "/"
             self.cur_dir = Path(new_path)
+        elif event.button.id == "preview_sort":
+            self.plan = plan_folder(self.dir_tree.path)
+            self.query_one(SortPlanView).show_plan(self.plan)
+            return
         elif event.button.id == "sort_folder":
             folder_to_sort = self.dir_tree.path
-            sorted_file = sorted_folder(folder_to_sort)
+            # the previewed plan is used if it is for this folder
+            plan = self.plan
+            if plan is not None and \
+                    Path(plan.destination_folder) != Path(folder_to_sort):
+                plan = None
+            sorted_file = sorted_folder(folder_to_sort,
+                                        self.app.config.sorter_workers, plan)
+            self.plan = None
+            self.query_one(SortPlanView).show_plan(None)
             self.notify(f"Folder {folder_to_sort} is sorted.\nResults saved to: {sorted_file}", timeout=7)
 
             self.dir_tree.refresh()
@@ -78,3 +78,163 @@ assert ab.data[5].name == rec1.name
 assert ab.records_quantity == 3
 assert ab.record_id == 5
 
+# detached books keep their own counters
+other = AddressBook.detached()
+other.add_record(Record(name="Detached Record"))
+assert other.record_id == other.record_counter == 1
+assert ab.records_quantity == 3
+assert ab.record_id == 5
+
+
+# name index block
+assert ab["Gustavo Gaviria"] is ab.data[5]
+assert ab["Jeorge Cassius"] is None
+assert ab.get("Vasyl Petrenko").id == 1
+
+with pytest.raises(KeyError, match="Record Vasyl Petrenko already exists"):
+    ab.edit_record(ab["Gustavo Gaviria"], Record(name="Vasyl Petrenko"))
+assert ab.data[5].name == "Gustavo Gaviria"
+
+ab.configure_name_index(casefold=True, normalization="NFC")
+assert ab["gustavo GAVIRIA"] is ab.data[5]
+with pytest.raises(KeyError, match="already exists"):
+    ab.add_record(Record(name="VASYL PETRENKO"))
+ab.configure_name_index()
+assert ab["gustavo GAVIRIA"] is None
+
+import pickle
+
+ab_copy = pickle.loads(pickle.dumps(ab))
+assert ab_copy is not ab
+assert ab_copy["Gustavo Gaviria"].id == 5
+assert set(ab_copy.data) == set(ab.data)
+
+# in-place changes block
+rec = ab["Gustavo Gaviria"]
+rec.name = "Gustavo Gaviria Jr"
+assert ab["Gustavo Gaviria"] is None
+assert ab["Gustavo Gaviria Jr"] is rec
+
+with pytest.raises(KeyError, match="Record Vasyl Petrenko already exists"):
+    rec.name = "Vasyl Petrenko"
+assert rec.name == "Gustavo Gaviria Jr"
+assert ab["Gustavo Gaviria Jr"] is rec
+
+# find_record block
+assert ab.find_record(["%NAME%petr"]) == [ab["Vasyl Petrenko"]]
+assert ab.find_record(["%NAME%vasyl"]) == [ab["Vasyl Petrenko"],
+                                           ab["Vasylyna Vlashchenko"]]
+assert ab.find_record(["%PHONES%345678"]) == [ab["Vasyl Petrenko"]]
+assert ab.find_record(["%NAME%zzz", "%EMAIL%nide"]) == [
+    ab["Vasylyna Vlashchenko"]]
+assert ab.find_record(["%NAME%Va"]) == [ab["Vasyl Petrenko"],
+                                        ab["Vasylyna Vlashchenko"]]
+
+rec = ab["Vasylyna Vlashchenko"]
+rec.set_email("vasylyna@some.dom")
+assert ab.find_record(["%EMAIL%nide"]) == []
+ab.delete_record(ab["Vasyl Petrenko"])
+assert ab.find_record(["%NAME%petr"]) == []
+
+# birthday index block
+from datetime import timedelta
+
+today = datetime.today().date()
+for days, name in ((3, "Ivan Soon"), (0, "Olena Today"), (1, "Petro Next"),
+                   (10, "Maria Later")):
+    bday = today + timedelta(days=days)
+    rec = Record(name=name)
+    rec.birthday = Birthday(date=bday.replace(year=bday.year - 30)
+                            if (bday.month, bday.day) != (2, 29)
+                            else bday.replace(year=1996))
+    ab.add_record(rec)
+
+assert [r.name for r in ab.today_mates()] == ["Olena Today"]
+assert [r.name for r in ab.upcoming_mates(5)][-2:] == ["Petro Next",
+                                                     "Ivan Soon"]
+assert "Maria Later" not in [r.name for r in ab.upcoming_mates(5)]
+
+ab["Petro Next"].birthday = None
+assert "Petro Next" not in [r.name for r in ab.upcoming_mates(5)]
+ab.delete_record(ab["Olena Today"])
+assert ab.today_mates() == []
+
+# paging block
+records = list(ab.data.values())
+assert ab.get_records(0, 2) == records[:2]
+assert ab.get_records(2, 100) == records[2:]
+assert list(ab.iterator()) == records
+assert [r.name for r in ab.iterator("name")] == sorted(r.name
+                                                       for r in records)
+by_bday = list(ab.iterator("birthday"))
+assert len(by_bday) == len(records)
+assert by_bday[0].name == "Ivan Soon"
+assert by_bday[-1].birthday is None
+
+with pytest.raises(ValueError, match="Unknown sort order"):
+    next(ab.iterator("phone"))
+
+# search plan block
+from pimp.cls.AddressBook import compile_search
+
+assert compile_search(["%name%Ivan", "%EMAIL%x"]) is compile_search(
+    ["%EMAIL%x", "%NAME%ivan", "%NAME%IVAN"])
+assert compile_search(["%NAME%ivan"], match_all=True) is not compile_search(
+    ["%NAME%ivan"])
+
+assert ab.find_record(["%EMAIL%vasylyna@some.dom"]) == [
+    ab["Vasylyna Vlashchenko"]]
+assert ab.find_record(["%BDAY%13-02"]) == [ab["Vasylyna Vlashchenko"]]
+assert ab.find_record(["%NAME%vasylyna", "%NAME%ivan"]) == [
+    ab["Vasylyna Vlashchenko"], ab["Ivan Soon"]]
+assert ab.find_record(["%NAME%vasylyna", "%NAME%ivan"],
+                      match_all=True) == []
+assert ab.find_record(["%NAME%vasylyna", "%PHONES%7482"],
+                      match_all=True) == [ab["Vasylyna Vlashchenko"]]
+assert ab.find_record(["%NAME%a", "%PHONES%7482"],
+                      match_all=True) == [ab["Vasylyna Vlashchenko"]]
+
+# phone index block
+vasylyna = ab["Vasylyna Vlashchenko"]
+assert ab.find_by_phone(number="7482984023") == [vasylyna]
+assert ab.find_by_phone(number="748298402") == []
+assert ab.find_by_phone(prefix="748") == [vasylyna]
+assert ab.find_by_phone(suffix="4023") == [vasylyna]
+assert ab.find_by_phone(prefix="748", suffix="4024") == []
+assert ab.find_by_phone() == []
+
+vasylyna.add_phone(Phone(number="5551234567"))
+assert ab.find_by_phone(suffix="4567") == [vasylyna]
+vasylyna.edit_phone(Phone(number="5551234567"), Phone(number="5559990000"))
+assert ab.find_by_phone(suffix="4567") == []
+assert ab.find_by_phone(prefix="555999") == [vasylyna]
+vasylyna.delete_phone(Phone(number="5559990000"))
+assert ab.find_by_phone(prefix="555") == []
+
+# sync block
+copy = AddressBook.detached()
+for record in ab.data.values():
+    copy.restore_record(record.model_copy(deep=True))
+assert ab.sync_with(copy) == ([], [], [])
+
+copy.data[vasylyna.id].email = "vasylyna@other.dom"
+removed = next(record for record in copy.data.values()
+               if record.id != vasylyna.id)
+copy.delete_record(removed)
+copy.add_record(Record(name="Synced Newcomer"))
+newcomer = copy["Synced Newcomer"]
+diff = ab.sync_with(copy)
+assert diff == ([newcomer.id], [vasylyna.id], [removed.id])
+assert ab["Synced Newcomer"].id == newcomer.id
+assert ab.find_record(["%EMAIL%other.dom"]) == [ab["Vasylyna Vlashchenko"]]
+assert ab[removed.name] is None
+
+# trigram index block
+for number in range(50):
+    ab.add_record(Record(name=f"Bulk Contact {number:02}"))
+assert len(ab.trigram_index) == len(ab.data)
+assert ab.find_record(["%NAME%contact 4"]) == [
+    ab[f"Bulk Contact {number}"] for number in range(40, 50)]
+ab["Bulk Contact 42"].name = "Bulk Renamed 42"
+assert ab.find_record(["%NAME%renamed"]) == [ab["Bulk Renamed 42"]]
+assert len(ab.find_record(["%NAME%contact 4"])) == 9
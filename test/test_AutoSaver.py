@@ -0,0 +1,67 @@
+# providers import the books as cls.*, so the tests do the same
+from cls.AutoSaver import AutoSaver
+from cls.AddressBook import AddressBook, Record
+from data_providers.PickleDataProvider import PickleDataProvider
+from modules.errors import DataProviderError
+from pathlib import Path
+import shutil
+import tempfile
+import time
+
+tmp = Path(tempfile.mkdtemp())
+
+ab = AddressBook.detached()
+provider = PickleDataProvider(tmp / "contacts.bin")
+saved = []
+saver = AutoSaver([(ab, provider)], interval=0.05,
+                  on_saved=lambda book, provider: saved.append(book))
+
+# dirty books block
+assert not saver.is_dirty(ab)
+saver.flush()
+assert saver.stats == {}
+assert not (tmp / "contacts.bin").exists()
+
+ab.add_record(Record(name="Vasyl Petrenko"))
+assert saver.is_dirty(ab)
+saver.flush()
+assert not saver.is_dirty(ab)
+assert saved == [ab]
+stats = saver.stats["AddressBook"]
+assert stats.error is None
+assert stats.bytes_written == (tmp / "contacts.bin").stat().st_size
+assert set(provider.read_data().data) == set(ab.data)
+
+ab.add_record(Record(name="Gustavo Gaviria"))
+saver.mark_saved(ab)
+assert not saver.is_dirty(ab)
+
+# failed saves block
+write_data = provider.write_data
+
+
+def broken_write(data):
+    raise DataProviderError("disk full")
+
+
+provider.write_data = broken_write
+ab.add_record(Record(name="Unsaved Newcomer"))
+saver.flush()
+assert saver.stats["AddressBook"].error == "disk full"
+assert saver.stats["AddressBook"].bytes_written == 0
+assert saver.is_dirty(ab)
+assert saved == [ab]
+provider.write_data = write_data
+
+# background block
+saver.start()
+deadline = time.monotonic() + 5
+while saver.is_dirty(ab) and time.monotonic() < deadline:
+    time.sleep(0.01)
+saver.stop()
+saver.join()
+assert not saver.is_dirty(ab)
+assert saver.stats["AddressBook"].error is None
+assert provider.read_data()["Unsaved Newcomer"] is not None
+
+shutil.rmtree(tmp)
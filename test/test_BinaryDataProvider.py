@@ -0,0 +1,79 @@
+# providers import the books as cls.*, so the tests do the same
+from data_providers.BinaryDataProvider import BinaryDataProvider, HEADER
+from cls.AddressBook import AddressBook, Record, Phone, Birthday, Address
+from cls.NoteBook import Note, Notebook
+from modules.errors import ChecksumError, DataProviderError
+from datetime import date
+from pathlib import Path
+import shutil
+import tempfile
+import pytest
+
+tmp = Path(tempfile.mkdtemp())
+
+ab = AddressBook.detached()
+ab.add_record(Record(name="Vasyl Petrenko",
+                     birthday=Birthday(date=date(1990, 2, 13)),
+                     email="petrenko@some.dom",
+                     address=Address(country="Україна", city="Київ",
+                                     zip="01001"),
+                     phones=[Phone(number="0501234567"),
+                             Phone(number="0671234567")]))
+ab.add_record(Record(name="Gustavo Gaviria",
+                     address=Address(country="Україна")))
+ab.add_record(Record(name="Nobody"))
+ab.delete_record(ab["Nobody"])
+
+nb = Notebook.detached()
+nb.add_record(Note(content="How to cook #borsch"))
+nb.add_record(Note(content="Stopwatch app", tags={"python", "textual"}))
+
+# round trip block
+provider = BinaryDataProvider(tmp / "contacts.pimb")
+assert provider.read_data() is None
+assert provider.write_data(ab) is True
+assert provider.bytes_written == (tmp / "contacts.pimb").stat().st_size
+ab_copy = provider.read_data()
+assert ([record.model_dump() for record in ab_copy.data.values()]
+        == [record.model_dump() for record in ab.data.values()])
+assert ab_copy["Vasyl Petrenko"].id == 1
+assert ab_copy.record_id == 2
+assert ab_copy.find_record(["%ADDRESS%київ"]) == [ab_copy["Vasyl Petrenko"]]
+ab_copy["Gustavo Gaviria"].email = "gaviria@other.dom"
+assert ab_copy["Gustavo Gaviria"].search_fields["EMAIL"] \
+    == ("gaviria@other.dom",)
+
+provider = BinaryDataProvider(tmp / "notes.pimb")
+assert provider.update_data(nb) is True
+nb_copy = provider.read_data()
+assert ([note.as_dict for note in nb_copy.data.values()]
+        == [note.as_dict for note in nb.data.values()])
+assert nb_copy.find_notes_by_tags(["python"]) \
+    == [nb_copy.data[max(nb_copy.data)]]
+
+# header block
+content = (tmp / "contacts.pimb").read_bytes()
+
+
+def read(data: bytes):
+    (tmp / "broken.pimb").write_bytes(data)
+    return BinaryDataProvider(tmp / "broken.pimb").read_data()
+
+
+flipped = bytearray(content)
+flipped[-1] ^= 0xFF
+assert isinstance(read(bytes(flipped)), ChecksumError)
+assert isinstance(read(content[:-1]), ChecksumError)
+error = read(b"PIMP" + content[4:])
+assert isinstance(error, DataProviderError)
+assert "Not a binary book file" in str(error)
+magic, version, *rest = HEADER.unpack_from(content)
+error = read(HEADER.pack(magic, version + 1, *rest) + content[HEADER.size:])
+assert "Unsupported format version" in str(error)
+
+# write errors block
+with pytest.raises(DataProviderError, match="Can't write"):
+    BinaryDataProvider(tmp / "missing" / "contacts.pimb").write_data(ab)
+assert (tmp / "contacts.pimb").read_bytes() == content
+
+shutil.rmtree(tmp)
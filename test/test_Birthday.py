@@ -23,3 +23,7 @@ bd = Birthday(date=datetime(day=today_check.day,
                             year=today_check.year-39))
 
 assert bd.days_to_birthday == 350
+
+bd = Birthday(date=datetime(day=29, month=2, year=1996))
+assert bd.in_year(2024) == datetime(day=29, month=2, year=2024).date()
+assert bd.in_year(2023) == datetime(day=28, month=2, year=2023).date()
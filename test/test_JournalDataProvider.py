@@ -0,0 +1,121 @@
+# providers import the books as cls.*, so the tests do the same
+from data_providers.JournalDataProvider import JournalDataProvider
+from cls.AddressBook import AddressBook, Record
+from cls.NoteBook import Note, Notebook
+from data_providers.PickleDataProvider import PickleDataProvider
+from modules.errors import DataProviderError
+from pathlib import Path
+import shutil
+import tempfile
+import pytest
+
+tmp = Path(tempfile.mkdtemp())
+
+
+def names(book):
+    return sorted(record.name for record in book.data.values())
+
+
+ab = AddressBook.detached()
+ab.add_record(Record(name="Vasyl Petrenko"))
+ab.add_record(Record(name="Gustavo Gaviria"))
+
+nb = Notebook.detached()
+nb.add_record(Note(content="How to cook #borsch"))
+
+# round trip block
+ab_provider = JournalDataProvider(tmp / "contacts.bin", compact_every=5)
+assert ab_provider.read_data() is None
+assert ab_provider.write_data(ab) is True
+ab_copy = JournalDataProvider(tmp / "contacts.bin").read_data()
+assert ([record.model_dump() for record in ab_copy.data.values()]
+        == [record.model_dump() for record in ab.data.values()])
+
+nb_provider = JournalDataProvider(tmp / "notes.bin")
+assert nb_provider.write_data(nb) is True
+nb.add_record(Note(content="Stopwatch app", tags={"python"}))
+nb.edit_record(nb.data[min(nb.data)], Note(content="Borsch #recipe"))
+nb_copy = JournalDataProvider(tmp / "notes.bin").read_data()
+assert ([note.as_dict for note in nb_copy.data.values()]
+        == [note.as_dict for note in nb.data.values()])
+
+# journal block
+snapshot = (tmp / "contacts.bin").read_bytes()
+written = ab_provider.bytes_written
+journal_size = (tmp / "contacts.bin.journal").stat().st_size
+for number in range(7):
+    ab.add_record(Record(name=f"Journaled {number}"))
+ab.delete_record(ab["Vasyl Petrenko"])
+ab["Gustavo Gaviria"].email = "gaviria@other.dom"
+# changes are journaled only, compaction is left to saving
+assert (tmp / "contacts.bin").read_bytes() == snapshot
+assert ab_provider.bytes_written - written \
+    == (tmp / "contacts.bin.journal").stat().st_size - journal_size
+assert names(JournalDataProvider(tmp / "contacts.bin").read_data()) \
+    == names(ab)
+
+# compaction block
+assert ab_provider.update_data(ab) is True
+assert (tmp / "contacts.bin").read_bytes() != snapshot
+assert not (tmp / "contacts.bin.journal.old").exists()
+ab.add_record(Record(name="After Compaction"))
+ab_copy = JournalDataProvider(tmp / "contacts.bin").read_data()
+assert names(ab_copy) == names(ab)
+assert ab_copy["Gustavo Gaviria"].email == "gaviria@other.dom"
+
+# a crash may cut the last line
+journal = (tmp / "contacts.bin.journal").read_bytes()
+with (tmp / "contacts.bin.journal").open("ab") as fout:
+    fout.write(b'{"op": "add", "rec')
+assert names(JournalDataProvider(tmp / "contacts.bin").read_data()) \
+    == names(ab)
+(tmp / "contacts.bin.journal").write_bytes(journal)
+
+# failed compaction block
+snapshot_writer = ab_provider._snapshot.write_data
+
+
+def broken_writer(data):
+    raise DataProviderError("disk full")
+
+
+ab_provider._snapshot.write_data = broken_writer
+for number in range(5):
+    ab.add_record(Record(name=f"Uncompacted {number}"))
+with pytest.raises(DataProviderError, match="disk full"):
+    ab_provider.update_data(ab)
+# the journal moved aside is replayed till a snapshot covers it
+assert (tmp / "contacts.bin.journal.old").exists()
+ab.add_record(Record(name="Next Journal"))
+assert names(JournalDataProvider(tmp / "contacts.bin").read_data()) \
+    == names(ab)
+ab_provider._snapshot.write_data = snapshot_writer
+assert ab_provider.update_data(ab) is True
+assert not (tmp / "contacts.bin.journal.old").exists()
+assert names(JournalDataProvider(tmp / "contacts.bin").read_data()) \
+    == names(ab)
+
+# double replay block
+renames = AddressBook.detached()
+provider = JournalDataProvider(tmp / "renames.bin")
+provider.write_data(renames)
+renames.add_record(Record(name="Vasyl Petrenko"))
+renames["Vasyl Petrenko"].name = "Vasyl Petrenko Sr"
+renames.add_record(Record(name="Vasyl Petrenko"))
+# a crash right after the snapshot is written leaves the journal behind,
+# its entries are replayed over the snapshot having them already
+PickleDataProvider(tmp / "renames.bin").write_data(renames)
+renames_copy = JournalDataProvider(tmp / "renames.bin").read_data()
+assert not isinstance(renames_copy, Exception)
+assert {record_id: record.name
+        for record_id, record in renames_copy.data.items()} \
+    == {1: "Vasyl Petrenko Sr", 2: "Vasyl Petrenko"}
+assert renames_copy["Vasyl Petrenko"].id == 2
+assert renames_copy.records_quantity == 2
+renames_copy.add_record(Record(name="Newcomer"))
+assert renames_copy["Newcomer"].id == 3
+provider.close()
+
+ab_provider.close()
+nb_provider.close()
+shutil.rmtree(tmp)
@@ -0,0 +1,56 @@
+# providers import the books as cls.*, so the tests do the same
+from data_providers.JsonlDataProvider import JsonlDataProvider
+from cls.AddressBook import AddressBook, Record, Phone, Birthday, Address
+from cls.NoteBook import Note, Notebook
+from modules.errors import DataProviderError
+from datetime import date
+from pathlib import Path
+import shutil
+import tempfile
+import pytest
+
+tmp = Path(tempfile.mkdtemp())
+
+ab = AddressBook.detached()
+ab.add_record(Record(name="Vasyl Petrenko",
+                     birthday=Birthday(date=date(1990, 2, 13)),
+                     address=Address(country="Україна", city="Київ"),
+                     phones=[Phone(number="0501234567")]))
+ab.add_record(Record(name="Gustavo Gaviria"))
+
+nb = Notebook.detached()
+nb.add_record(Note(content="How to cook #borsch"))
+nb.add_record(Note(content="Stopwatch app", tags={"python", "textual"}))
+
+# round trip block
+provider = JsonlDataProvider(tmp / "contacts.jsonl")
+assert provider.read_data() is None
+assert provider.write_data(ab) is True
+assert provider.bytes_written == (tmp / "contacts.jsonl").stat().st_size
+ab_copy = provider.read_data()
+assert ab_copy is not ab
+assert ([record.model_dump() for record in ab_copy.data.values()]
+        == [record.model_dump() for record in ab.data.values()])
+assert ab_copy["Vasyl Petrenko"].id == ab["Vasyl Petrenko"].id
+
+provider = JsonlDataProvider(tmp / "notes.jsonl")
+assert provider.update_data(nb) is True
+nb_copy = provider.read_data()
+assert ([note.as_dict for note in nb_copy.data.values()]
+        == [note.as_dict for note in nb.data.values()])
+
+# format block
+lines = (tmp / "contacts.jsonl").read_text(encoding="utf-8").splitlines()
+assert lines[0] == '{"book": "AddressBook", "version": 1}'
+assert len(lines) == 1 + len(ab.data)
+
+(tmp / "old.jsonl").write_text('{"book": "AddressBook", "version": 0}\n')
+assert isinstance(JsonlDataProvider(tmp / "old.jsonl").read_data(),
+                  ValueError)
+
+# write errors block
+with pytest.raises(DataProviderError, match="Can't write"):
+    JsonlDataProvider(tmp / "missing" / "contacts.jsonl").write_data(ab)
+assert not (tmp / "missing").exists()
+
+shutil.rmtree(tmp)
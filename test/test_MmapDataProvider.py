@@ -0,0 +1,78 @@
+# providers import the books as cls.*, so the tests do the same
+from data_providers.MmapDataProvider import MmapDataProvider
+from cls.AddressBook import AddressBook, Record, Phone, Birthday, Address
+from cls.MappedAddressBook import MappedAddressBook
+from modules.errors import DataProviderError
+from datetime import date
+from pathlib import Path
+import shutil
+import tempfile
+import pytest
+
+tmp = Path(tempfile.mkdtemp())
+
+ab = AddressBook.detached()
+ab.add_record(Record(name="Vasyl Petrenko",
+                     birthday=Birthday(date=date(1990, 2, 13)),
+                     email="petrenko@some.dom",
+                     address=Address(country="Україна", city="Київ"),
+                     phones=[Phone(number="0501234567")]))
+ab.add_record(Record(name="Gustavo Gaviria",
+                     birthday=Birthday(date=date(1985, 12, 31))))
+ab.add_record(Record(name="Anna Nobirthday"))
+
+# round trip block
+provider = MmapDataProvider(tmp / "contacts.pimm")
+assert provider.read_data() is None
+assert provider.write_data(ab) is True
+assert provider.bytes_written == (tmp / "contacts.pimm").stat().st_size
+mapped = provider.read_data()
+assert isinstance(mapped, MappedAddressBook)
+assert len(mapped) == mapped.records_quantity == 3
+assert ([record.model_dump() for record in mapped.iterator()]
+        == [record.model_dump() for record in ab.data.values()])
+assert mapped.get_records(1, 5) == [mapped.data[2], mapped.data[3]]
+assert mapped["Gustavo Gaviria"] is mapped.data[2]
+assert mapped["Nobody"] is None
+assert [record.name for record in mapped.iterator("name")] \
+    == ["Anna Nobirthday", "Gustavo Gaviria", "Vasyl Petrenko"]
+assert mapped.find_record(["%EMAIL%some.dom"]) == [mapped.data[1]]
+
+# read-only block
+with pytest.raises(ValueError, match="read_only_book"):
+    mapped.add_record(Record(name="Newcomer"))
+with pytest.raises(ValueError, match="read_only_book"):
+    mapped.delete_record(mapped.data[1])
+# nothing to save for a mapped book
+assert provider.update_data(mapped) is True
+
+# header block
+content = (tmp / "contacts.pimm").read_bytes()
+(tmp / "broken.pimm").write_bytes(b"PIMB" + content[4:])
+error = MmapDataProvider(tmp / "broken.pimm").read_data()
+assert isinstance(error, DataProviderError)
+assert "Not a mapped book file" in str(error)
+
+# write errors block
+with pytest.raises(DataProviderError, match="Can't write"):
+    MmapDataProvider(tmp / "missing" / "contacts.pimm").write_data(ab)
+
+# sync in the middle of iteration block
+mapped.data.store.close()
+big = AddressBook.detached()
+for number in range(10):
+    big.add_record(Record(name=f"Contact {number}"))
+MmapDataProvider(tmp / "big.pimm").write_data(big)
+for number in range(5, 10):
+    big.delete_record(big[f"Contact {number}"])
+MmapDataProvider(tmp / "small.pimm").write_data(big)
+for sort_by in ("id", "name", "birthday"):
+    mapped = MmapDataProvider(tmp / "big.pimm").read_data()
+    records = mapped.iterator(sort_by)
+    seen = [next(records).name for _ in range(3)]
+    mapped.sync_with(MmapDataProvider(tmp / "small.pimm").read_data())
+    seen += [record.name for record in records]
+    assert seen == [f"Contact {number}" for number in range(5)]
+
+mapped.data.store.close()
+shutil.rmtree(tmp)
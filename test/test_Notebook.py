@@ -0,0 +1,115 @@
+# Notebook tests go here
+from pimp.cls.NoteBook import Note, Notebook
+import pytest
+
+nb = Notebook()
+
+notes = [Note(content="How to cook borsch? I like borsch very much."),
+         Note(content="Cooking a stopwatch application with Textual."),
+         Note(content="Scan through string looking for the first location "
+                      + "where the regular expression pattern matches.")]
+for note_id, note in enumerate(notes, start=1):
+    note.note_id = note_id
+    assert nb.add_record(note) is True
+
+# word index block
+assert nb.find_notes_by_keyword([]) == []
+assert nb.find_notes_by_keyword(["cook"]) == [notes[0]]
+assert nb.find_notes_by_keyword(["COOK", "textual"]) == notes[:2]
+assert nb.find_notes_by_keyword(["cook"], mode="prefix") == notes[:2]
+assert nb.find_notes_by_keyword(["regular", "expression"],
+                                mode="phrase") == [notes[2]]
+assert nb.find_notes_by_keyword(["expression", "regular"],
+                                mode="phrase") == []
+with pytest.raises(ValueError, match="Unknown search mode"):
+    nb.find_notes_by_keyword(["cook"], mode="fuzzy")
+
+new_note = Note(content="Borsch with pampushky")
+assert nb.edit_record(notes[0], new_note) is True
+assert new_note.note_id == 1
+assert nb.find_notes_by_keyword(["cook"]) == []
+assert nb.find_notes_by_keyword(["pampushky"]) == [new_note]
+
+nb.delete_record(new_note)
+assert nb.find_notes_by_keyword(["borsch"]) == []
+with pytest.raises(ValueError, match="no_such_note"):
+    nb.edit_record(new_note, Note(content="Nothing"))
+
+# tag index block
+tagged = [Note(content="Stopwatch app #python", tags={"textual", "ui"}),
+          Note(content="Regular expressions", tags=["python", "pattern"]),
+          Note(content="Alpha Centauri", tags={"astronomy"})]
+for note_id, note in enumerate(tagged, start=10):
+    note.note_id = note_id
+    nb.add_record(note)
+
+assert tagged[0].tags == {"python", "textual", "ui"}
+assert nb.find_notes_by_tags(["python"]) == tagged[:2]
+assert nb.find_notes_by_tags(["textual", "astronomy"]) == [tagged[0],
+                                                           tagged[2]]
+assert nb.find_notes_by_tags(["python", "AND", "pattern"]) == [tagged[1]]
+assert nb.find_notes_by_tags(["python", "AND", "NOT", "ui"]) == [tagged[1]]
+assert nb.find_notes_by_tags(["python", "AND", "ui", "OR",
+                              "astronomy"]) == [tagged[0], tagged[2]]
+assert nb.find_notes_by_tags(["NOT", "python"]) == [
+    note for note in nb.data.values() if "python" not in note.tags]
+
+assert nb.retag(tagged[2], {"space"}) is True
+assert nb.find_notes_by_tags(["astronomy"]) == []
+assert "astronomy" not in nb.tag_pool
+nb.delete_record(tagged[0])
+assert nb.find_notes_by_tags(["ui"]) == []
+assert nb.note_tags.get(tagged[0].note_id) is None
+
+# note id block
+from datetime import datetime, timedelta
+from pimp.cls.NoteBook import NoteIdAllocator
+
+before = datetime.now() - timedelta(seconds=1)
+batch = [Note(content=f"Meeting note {i}") for i in range(5000)]
+for note in batch:
+    assert note.note_id is None
+    nb.add_record(note)
+
+ids = [note.note_id for note in batch]
+assert ids == sorted(set(ids))
+assert nb[ids[0]] is batch[0]
+assert nb.get_records(len(nb.data) - 2, 2) == batch[-2:]
+assert before <= batch[0].created <= datetime.now()
+assert nb.find_notes_by_period(before, datetime.now()
+                               + timedelta(seconds=1)) == batch
+assert nb.find_notes_by_period(datetime.fromtimestamp(0), before) == [
+    note for note in nb.data.values() if note.note_id < ids[0]]
+
+legacy = Note(content="Old note")
+legacy.note_id = 1706099573
+nb.add_record(legacy)
+assert legacy.created == datetime.fromtimestamp(1706099573)
+assert nb.find_notes_by_period(datetime.fromtimestamp(1706099573),
+                               datetime.fromtimestamp(1706099574)) == [legacy]
+
+allocator = NoteIdAllocator(last_id=ids[-1] + 10 ** 9)
+assert allocator.next_id() == ids[-1] + 10 ** 9 + 1
+
+# sync block
+copy = Notebook.detached()
+for note in nb.data.values():
+    copy.add_record(Note.from_dict(note.as_dict))
+assert nb.sync_with(copy) == ([], [], [])
+
+copy.delete_record(copy[legacy.note_id])
+copy.edit_record(copy[ids[0]], Note(content="Edited elsewhere #synced"))
+copy.add_record(Note(content="Written elsewhere"))
+added = max(copy.data)
+assert nb.sync_with(copy) == ([added], [ids[0]], [legacy.note_id])
+assert nb[legacy.note_id] is None
+assert nb.find_notes_by_tags(["synced"]) == [nb[ids[0]]]
+assert nb.find_notes_by_keyword(["elsewhere"]) == [nb[ids[0]], nb[added]]
+
+# pickle block
+import pickle
+
+nb_copy = pickle.loads(pickle.dumps(nb))
+assert nb_copy.records_quantity == nb.records_quantity == len(nb.data)
+nb_copy.delete_record(nb_copy[added])
+assert nb_copy.records_quantity == len(nb.data) - 1
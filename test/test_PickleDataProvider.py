@@ -0,0 +1,84 @@
+# providers import the books as cls.*, so the tests do the same
+from data_providers.PickleDataProvider import PickleDataProvider, HEADER
+from cls.AddressBook import AddressBook, Record
+from cls.NoteBook import Note, Notebook
+from modules.errors import ChecksumError, DataProviderError
+from pathlib import Path
+import pickle
+import shutil
+import tempfile
+import pytest
+
+tmp = Path(tempfile.mkdtemp())
+
+ab = AddressBook.detached()
+ab.add_record(Record(name="Vasyl Petrenko"))
+ab.add_record(Record(name="Gustavo Gaviria"))
+
+nb = Notebook.detached()
+nb.add_record(Note(content="How to cook #borsch"))
+
+# round trip block
+provider = PickleDataProvider(tmp / "contacts.bin")
+assert provider.read_data() is None
+assert provider.write_data(ab) is True
+assert provider.bytes_written == (tmp / "contacts.bin").stat().st_size
+ab_copy = provider.read_data()
+assert ([record.model_dump() for record in ab_copy.data.values()]
+        == [record.model_dump() for record in ab.data.values()])
+assert not (tmp / "contacts.bin.tmp").exists()
+
+provider = PickleDataProvider(tmp / "notes.bin")
+assert provider.update_data(nb) is True
+nb_copy = provider.read_data()
+assert ([note.as_dict for note in nb_copy.data.values()]
+        == [note.as_dict for note in nb.data.values()])
+assert nb_copy.records_quantity == 1
+
+# snapshots without header are read as before
+(tmp / "old.bin").write_bytes(pickle.dumps(ab))
+assert set(PickleDataProvider(tmp / "old.bin").read_data().data) \
+    == set(ab.data)
+
+# header block
+content = (tmp / "contacts.bin").read_bytes()
+
+
+def read(data: bytes):
+    (tmp / "broken.bin").write_bytes(data)
+    return PickleDataProvider(tmp / "broken.bin").read_data()
+
+
+flipped = bytearray(content)
+flipped[-2] ^= 0xFF
+assert isinstance(read(bytes(flipped)), ChecksumError)
+assert isinstance(read(content[:-10]), ChecksumError)
+assert isinstance(read(content[:HEADER.size - 1]), ChecksumError)
+
+magic, version, count, size, checksum = HEADER.unpack(content[:HEADER.size])
+error = read(HEADER.pack(magic, version + 1, count, size, checksum)
+             + content[HEADER.size:])
+assert isinstance(error, DataProviderError)
+assert "Unsupported snapshot version" in str(error)
+error = read(HEADER.pack(magic, version, count + 1, size, checksum)
+             + content[HEADER.size:])
+assert isinstance(error, ChecksumError)
+assert "instead of 3" in str(error)
+
+# write errors block
+with pytest.raises(DataProviderError, match="Can't write"):
+    PickleDataProvider(tmp / "missing" / "contacts.bin").write_data(ab)
+
+
+class Unpicklable:
+    def __reduce__(self):
+        raise TypeError("can't pickle")
+
+
+with pytest.raises(DataProviderError, match="can't pickle"):
+    PickleDataProvider(tmp / "contacts.bin").write_data(Unpicklable())
+# the old snapshot survives a failed write
+assert (tmp / "contacts.bin").read_bytes() == content
+assert not (tmp / "contacts.bin.tmp").exists()
+
+shutil.rmtree(tmp)
@@ -0,0 +1,133 @@
+# providers import the books as cls.*, so the tests do the same
+from cls.PimpEnvironment import PimpEnvironment
+from cls.LazyBook import LazyBook
+from cls.AddressBook import AddressBook, Record
+from cls.NoteBook import Note, Notebook
+from data_providers.PickleDataProvider import PickleDataProvider
+from modules.errors import ChecksumError, DataProviderError
+from pathlib import Path
+import shutil
+import tempfile
+import pytest
+
+tmp = Path(tempfile.mkdtemp())
+
+
+def write_config(ab_provider: str, ab_file: str) -> Path:
+    config = tmp / "config.yaml"
+    config.write_text(f"AddressBook:\n"
+                      f"  provider: {ab_provider}\n"
+                      f"  connection: {tmp / ab_file}\n"
+                      f"NoteBook:\n"
+                      f"  provider: file:pickle\n"
+                      f"  connection: {tmp / 'notes.bin'}\n"
+                      f"Autosave:\n"
+                      f"  interval: 0\n", encoding="utf-8")
+    return config
+
+
+ab = AddressBook.detached()
+ab.add_record(Record(name="Vasyl Petrenko"))
+ab.add_record(Record(name="Gustavo Gaviria"))
+PickleDataProvider(tmp / "contacts.bin").write_data(ab)
+
+# background loading block
+env = PimpEnvironment()
+env.read_config(write_config("file:pickle", "contacts.bin"))
+assert isinstance(env.address_book, LazyBook)
+assert env.wait_loaded(5)
+assert env.address_book.loaded
+assert not env.address_book.failed
+book = env.address_book.wait()
+assert isinstance(book, AddressBook)
+# loading doesn't touch the counters of the other books
+assert book is not AddressBook()
+assert AddressBook().records_quantity == 0
+assert set(book.data) == set(ab.data)
+assert book.records_quantity == 2
+assert book.record_id == 2
+# missing notebook file gives an empty book
+assert len(env.note_book.data) == 0
+assert env.note_book.records_quantity == 0
+
+# load timings block
+assert set(env.load_timings) == {"AddressBook", "Notebook"}
+assert all(seconds >= 0 for seconds in env.load_timings.values())
+
+# loading errors block
+(tmp / "broken.bin").write_bytes(
+    (tmp / "contacts.bin").read_bytes()[:-1])
+env.read_config(write_config("file:pickle", "broken.bin"))
+assert env.wait_loaded(5)
+assert env.address_book.loaded
+assert env.address_book.failed
+assert isinstance(env.address_book.error, ChecksumError)
+with pytest.raises(ChecksumError):
+    env.address_book.wait()
+# saving skips the book failed to load
+assert env.save_data() is True
+
+# hot reload block
+(tmp / "notes.bin").unlink(missing_ok=True)
+env.read_config(write_config("file:journal", "journal.bin"))
+assert env.wait_loaded(5)
+contacts = env.address_book.wait()
+notes = env.note_book.wait()
+# own changes are not reloaded, neither before nor after saving
+contacts.add_record(Record(name="Own Newcomer"))
+assert env.read_changes() == {}
+env.autosaver.flush()
+assert env.read_changes() == {}
+contacts.add_record(Record(name="Journaled Newcomer"))
+env.autosaver.flush()
+assert env.refresh_data() == {}
+
+outside = Notebook.detached()
+outside.add_record(Note(content="Written outside #sync"))
+PickleDataProvider(tmp / "notes.bin").write_data(outside)
+changes = env.read_changes()
+assert list(changes) == ["Notebook"]
+assert notes.data == {}
+diffs = env.apply_changes(changes)
+assert diffs["Notebook"].added == list(outside.data)
+assert notes.find_notes_by_tags(["sync"])[0].content \
+    == "Written outside sync"
+assert not env.autosaver.is_dirty(notes)
+assert env.read_changes() == {}
+
+# dirty books block
+first_id = min(notes.data)
+notes.add_record(Note(content="Not saved yet"))
+notes.edit_record(notes.data[first_id], Note(content="Edited here"))
+outside.edit_record(outside.data[first_id], Note(content="Edited outside"))
+# ids are taken from the clock, keep the outside one apart from own
+written_outside = Note(content="Written outside again")
+written_outside.note_id = max(notes.data) + 1
+outside.add_record(written_outside)
+PickleDataProvider(tmp / "notes.bin").write_data(outside)
+changes = env.read_changes()
+assert list(changes) == ["Notebook"]
+diffs = env.apply_changes(changes)
+# outside changes are merged, own changes win
+assert diffs["Notebook"] == ([written_outside.note_id], [], [])
+assert env.conflicts == {"Notebook": [first_id]}
+assert [note.content for note in notes.data.values()] \
+    == ["Edited here", "Not saved yet", "Written outside again"]
+assert env.autosaver.is_dirty(notes)
+assert env.save_data() is True
+assert [note.content for note in
+        PickleDataProvider(tmp / "notes.bin").read_data().data.values()] \
+    == ["Edited here", "Not saved yet", "Written outside again"]
+assert env.read_changes() == {}
+
+# failed reads block
+outside.add_record(Note(content="Read on second try"))
+PickleDataProvider(tmp / "notes.bin").write_data(outside)
+read_data = PickleDataProvider.read_data
+PickleDataProvider.read_data = lambda self: DataProviderError("busy")
+assert env.read_changes() == {}
+PickleDataProvider.read_data = read_data
+# the file is still new, as it wasn't read
+assert list(env.read_changes()) == ["Notebook"]
+
+shutil.rmtree(tmp)
@@ -114,3 +114,10 @@ assert rec.search_str == check_str
 with pytest.raises(ValueError,
                    match="Record got no address field"):
     rec.delete_address()
+
+# search string cache block
+assert rec.search_str is rec.search_str
+rec.add_phone(Phone(number=5678901234))
+assert "|5678901234::" in rec.search_str
+rec.name = "Vasyl Petrenko-Kyivsky"
+assert rec.search_str.startswith("%NAME%Vasyl Petrenko-Kyivsky::")
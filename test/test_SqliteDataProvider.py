@@ -0,0 +1,71 @@
+# providers import the books as cls.*, so the tests do the same
+from data_providers.SqliteDataProvider import SqliteDataProvider
+from cls.AddressBook import AddressBook, Record, Phone
+from cls.NoteBook import Note, Notebook
+from modules.errors import DataProviderError
+from pathlib import Path
+import shutil
+import sqlite3
+import tempfile
+import pytest
+
+tmp = Path(tempfile.mkdtemp())
+
+ab = AddressBook.detached()
+ab.add_record(Record(name="Vasyl Petrenko", email="petrenko@some.dom",
+                     phones=[Phone(number="0501234567")]))
+ab.add_record(Record(name="Vasylyna Vlashchenko"))
+ab.add_record(Record(name="Gustavo Gaviria"))
+ab.delete_record(ab["Vasylyna Vlashchenko"])
+
+nb = Notebook.detached()
+nb.add_record(Note(content="How to cook #borsch"))
+nb.add_record(Note(content="Stopwatch app", tags={"python"}))
+
+# round trip block
+ab_provider = SqliteDataProvider(tmp / "contacts.db")
+assert ab_provider.read_data() is None
+assert ab_provider.write_data(ab) is True
+assert ab_provider.bytes_written > 0
+ab_copy = SqliteDataProvider(tmp / "contacts.db").read_data()
+assert ab_copy is not ab
+assert ([record.model_dump() for record in ab_copy.data.values()]
+        == [record.model_dump() for record in ab.data.values()])
+assert ab_copy.record_id == 3
+
+nb_provider = SqliteDataProvider(tmp / "notes.db")
+assert nb_provider.write_data(nb) is True
+nb_copy = SqliteDataProvider(tmp / "notes.db").read_data()
+assert ([note.as_dict for note in nb_copy.data.values()]
+        == [note.as_dict for note in nb.data.values()])
+
+# write-through block
+ab.add_record(Record(name="Synced Newcomer"))
+ab["Gustavo Gaviria"].email = "gaviria@other.dom"
+ab_copy = SqliteDataProvider(tmp / "contacts.db").read_data()
+assert ab_copy["Synced Newcomer"].id == ab["Synced Newcomer"].id
+assert ab_copy["Gustavo Gaviria"].email == "gaviria@other.dom"
+assert ab.find_record(["%EMAIL%other.dom"]) == [ab["Gustavo Gaviria"]]
+assert ab.find_record(["%PHONES%1234"]) == [ab["Vasyl Petrenko"]]
+
+# write errors block
+connect = ab_provider._connect
+
+
+def broken_connect():
+    raise sqlite3.OperationalError("disk I/O error")
+
+
+ab_provider._connect = broken_connect
+# a change failed to be written through doesn't fail the change itself
+ab.add_record(Record(name="Lost Newcomer"))
+with pytest.raises(DataProviderError, match="disk I/O error"):
+    ab_provider.update_data(ab)
+ab_provider._connect = connect
+assert ab_provider.update_data(ab) is True
+ab_copy = SqliteDataProvider(tmp / "contacts.db").read_data()
+assert ab_copy["Lost Newcomer"].id == ab["Lost Newcomer"].id
+
+ab_provider.close()
+nb_provider.close()
+shutil.rmtree(tmp)
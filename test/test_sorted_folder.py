@@ -0,0 +1,177 @@
+from pimp.modules.sorted_folder import (Manifest, SortIndex, SortJournal,
+                                        plan_folder, sorted_folder,
+                                        move_files, INDEX_NAME, JOURNAL_NAME,
+                                        RESULTS_NAME)
+from pathlib import Path
+import shutil
+import tempfile
+import zipfile
+
+tmp = Path(tempfile.mkdtemp())
+
+
+def make_tree(root: Path) -> Path:
+    for folder in ("a/b/c", "empty/x", "images"):
+        (root / folder).mkdir(parents=True, exist_ok=True)
+    for name in ("a/Фото 1.JPG", "a/b/doc.pdf", "a/b/c/song.mp3",
+                 "notes.weird", "a/b/Foto_1.JPG", "images/old one.png",
+                 "a/b/movie.mkv", "a/t.gz"):
+        (root / name).write_text(name, encoding="utf-8")
+    with zipfile.ZipFile(root / "a" / "Архів.zip", "w") as archive:
+        archive.writestr("inner/pic.png", "pic")
+        archive.writestr("readme.txt", "readme")
+    return root
+
+
+def layout(root: Path) -> list:
+    """Files of a tree, but the ones the sorter keeps for itself."""
+    return sorted(str(path.relative_to(root)) for path in root.rglob("*")
+                  if path.is_file()
+                  and path.name not in (INDEX_NAME, JOURNAL_NAME,
+                                        RESULTS_NAME))
+
+
+# manifest block
+root = make_tree(tmp / "scan")
+(root / RESULTS_NAME).write_text("left by the last sort")
+manifest = Manifest.scan(str(root))
+assert sorted(entry.name for entry in manifest.files) == sorted(
+    ["Фото 1.JPG", "doc.pdf", "song.mp3", "notes.weird", "Foto_1.JPG",
+     "old one.png", "movie.mkv", "t.gz", "Архів.zip"])
+categories = {entry.name: entry.category for entry in manifest.files}
+assert categories["song.mp3"] == "audio"
+assert categories["notes.weird"] == "unknown"
+assert categories["Архів.zip"] == "archives"
+assert all(entry.size == (root / entry.path).stat().st_size
+           for entry in manifest.files)
+# subfolders are listed where they are met, as a recursive walk does
+folders = [str(Path(folder).relative_to(root))
+           for folder in manifest.folders]
+assert set(folders) == {"a", "a/b", "a/b/c", "empty", "empty/x", "images"}
+assert folders.index("a/b/c") == folders.index("a/b") + 1
+assert manifest.unchanged == set()
+
+# thread pool block
+sorted_by_one = make_tree(tmp / "one")
+sorted_folder(str(sorted_by_one), workers=1)
+root = make_tree(tmp / "pool")
+sorted_folder(str(root), workers=8)
+assert layout(root) == layout(sorted_by_one) == [
+    "archives/Архів/inner_pic.png", "archives/Архів/readme.txt",
+    "audio/song.mp3", "documents/doc.pdf", "images/Foto_1.JPG",
+    "images/old_one.png", "unknown/notes.weird", "video/movie.mkv"]
+# the name clash is resolved the same way
+assert (root / "images" / "Foto_1.JPG").read_text(encoding="utf-8") \
+    == (sorted_by_one / "images" / "Foto_1.JPG").read_text(encoding="utf-8")
+assert not (root / "a").exists() and not (root / "empty").exists()
+results = (root / RESULTS_NAME).read_text(encoding="utf-8")
+assert str(root / "audio" / "song.mp3") in results
+assert not (root / JOURNAL_NAME).exists()
+
+# dry run block
+root = make_tree(tmp / "plan")
+before = layout(root)
+plan = plan_folder(root)
+assert layout(root) == before
+assert not (root / JOURNAL_NAME).exists()
+summary = plan.summary()
+assert summary.files == 9
+assert summary.size == sum((root / path).stat().st_size for path in before)
+assert (summary.moves, summary.extractions, summary.deletions) == (7, 1, 2)
+assert summary.clashes == 1
+assert summary.categories["images"][0] == 3
+assert summary.unchanged == 0
+
+# the preview is what sorting does
+sorted_folder(root, plan=plan)
+moves = {}
+for operation in plan.operations:
+    if operation.action == "move":
+        moves[operation.target] = operation.source
+    else:
+        assert not Path(operation.source).exists()
+for target, source in moves.items():
+    assert Path(target).read_text(encoding="utf-8") \
+        == str(Path(source).relative_to(root))
+assert layout(root) == layout(sorted_by_one)
+
+# resume block
+root = make_tree(tmp / "resume")
+plan = plan_folder(root)
+journal = SortJournal.start(plan)
+moves = [(index, operation)
+         for index, operation in enumerate(plan.operations)
+         if operation.action == "move"]
+# interrupted after a few moves, the last one didn't get to the journal
+for index, operation in moves[:3]:
+    Path(operation.target).parent.mkdir(exist_ok=True)
+    move_files([(index, operation)], operation.target, journal)
+index, operation = moves[3]
+Path(operation.target).parent.mkdir(exist_ok=True)
+shutil.move(operation.source, operation.target)
+journal._file.close()
+assert (root / JOURNAL_NAME).exists()
+
+resumed = SortJournal.resume(str(root), SortIndex.load(str(root)))
+assert sorted(resumed.done) == [index for index, _ in moves[:3]]
+assert resumed.plan.operations == plan.operations
+resumed._file.close()
+
+moved = []
+real_move = shutil.move
+
+
+def counting_move(source, target):
+    moved.append(source)
+    return real_move(source, target)
+
+
+shutil.move = counting_move
+try:
+    sorted_folder(root)
+finally:
+    shutil.move = real_move
+# operations done before the interruption are not made again
+assert not {operation.source for _, operation in moves[:3]} & set(moved)
+assert len(moved) == len(set(moved)) == len(moves) - 3
+assert layout(root) == layout(sorted_by_one)
+assert not (root / JOURNAL_NAME).exists()
+
+# incremental sort block
+root = tmp / "pool"
+assert (root / INDEX_NAME).exists()
+plan = plan_folder(root)
+assert plan.operations == []
+assert plan.summary().unchanged == len(layout(root))
+# unchanged category folders are not even listed
+assert [Path(folder).name for folder in plan.manifest.folders] == []
+
+(root / "Нова пісня.mp3").write_text("new", encoding="utf-8")
+plan = plan_folder(root)
+assert sorted((operation.action, Path(operation.source).name)
+              for operation in plan.operations) \
+    == [("move", "Нова пісня.mp3")]
+assert plan.summary().unchanged == len(layout(root)) - 1
+
+moved = []
+shutil.move = counting_move
+try:
+    sorted_folder(root)
+finally:
+    shutil.move = real_move
+assert moved == [str(root / "Нова пісня.mp3")]
+assert "audio/Nova_pisnia.mp3" in layout(root)
+assert plan_folder(root).operations == []
+# unchanged files are still listed in the results
+results = (root / RESULTS_NAME).read_text(encoding="utf-8")
+assert str(root / "video" / "movie.mkv") in results
+
+# leftovers block
+# temporary files of a crashed sort are not sorted as unknown files
+for name in (JOURNAL_NAME + ".tmp", INDEX_NAME + ".tmp"):
+    (root / name).write_text("left by a crash", encoding="utf-8")
+assert plan_folder(root).operations == []
+sorted_folder(root)
+assert list(root.glob("*/*.tmp")) == []
+
+shutil.rmtree(tmp)